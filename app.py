@@ -1,22 +1,35 @@
 import os
-import uuid
 import logging
 import datetime
 import json
 import calendar
 import secrets
 import re
+import hmac
+import io
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
 from urllib.parse import urljoin, urlparse
 
+import orjson
 import requests
 import stripe
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import Flask, render_template, request, redirect, url_for, session, flash, g, make_response
+from flask.json.provider import DefaultJSONProvider
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_wtf.csrf import CSRFProtect
 from flask_talisman import Talisman
+from jinja2 import FileSystemBytecodeCache
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
+from storage3.exceptions import StorageApiError
 
 from supabase_client import get_supabase, get_supabase_url, STORAGE_BUCKET
 
@@ -32,7 +45,37 @@ APP_VERSION = "1.0.0"
 # App & Logging Setup
 # -----------------------
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Encode JSON responses with orjson instead of the stdlib json module."""
+
+    def dumps(self, obj, **kwargs):
+        # orjson output is always compact, so only other stdlib options
+        # (e.g. indent for debug output) need the default encoder. Dates,
+        # Decimal, UUID and dataclasses still go through default(), and
+        # non-str dict keys are stringified, as with stdlib json.
+        if kwargs.keys() - {"separators"}:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Optionally keep compiled templates on disk (set JINJA_CACHE_DIR) so new
+# worker processes skip parsing them. Entries are checked against the
+# template source, so edits are picked up.
+JINJA_CACHE_DIR = os.environ.get("JINJA_CACHE_DIR")
+if JINJA_CACHE_DIR:
+    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
 
 # Security: Generate secure SECRET_KEY if not provided
 if not os.environ.get("SECRET_KEY"):
@@ -56,12 +99,26 @@ app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 app.config["PERMANENT_SESSION_LIFETIME"] = datetime.timedelta(minutes=30)
 
 ALLOWED_IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
+IMAGE_CONTENT_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+}
+# Must match the CHECK constraints on maintenance_requests
+MAINTENANCE_STATUSES = frozenset({"Open", "In progress", "Completed"})
+MAINTENANCE_PRIORITIES = frozenset({"Low", "Normal", "High", "Emergency"})
+# Statuses that can become overdue (see _apply_deepl_and_overdue)
+OVERDUE_STATUSES = frozenset({"Open", "In progress"})
 PASSWORD_MIN_LENGTH = 8
 
 os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
+# DEBUG is very chatty (every query and request); opt in with LOG_LEVEL=DEBUG.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=getattr(logging, LOG_LEVEL, logging.INFO),
     format="[%(asctime)s] %(levelname)s in %(module)s: %(message)s",
 )
 logger = logging.getLogger(__name__)
@@ -117,286 +174,62 @@ if not STRIPE_SECRET_KEY:
     )
 else:
     stripe.api_key = STRIPE_SECRET_KEY
+    # Bound how long a slow Stripe API call can hold a request worker.
+    stripe.default_http_client = stripe.RequestsClient(timeout=10)
     logger.info("Stripe API key configured.")
 
 
-@app.context_processor
-def inject_stripe_publishable_key():
-    """Expose Stripe publishable key to all templates as {{ stripe_publishable_key }}."""
-    return {"stripe_publishable_key": STRIPE_PUBLISHABLE_KEY}
+# Expose Stripe publishable key to all templates as {{ stripe_publishable_key }}
+app.jinja_env.globals["stripe_publishable_key"] = STRIPE_PUBLISHABLE_KEY
 
 
 # -----------------------
 # Language / i18n config
 # -----------------------
 
-SUPPORTED_LANGS = ["en", "es"]
+SUPPORTED_LANGS = ("en", "es")  # display order
+_SUPPORTED_LANGS_SET = frozenset(SUPPORTED_LANGS)
 DEFAULT_LANG = "en"
 
-TRANSLATIONS = {
-    # ----------------------
-    # Navigation
-    # ----------------------
-    "nav_home": {"en": "Home", "es": "Inicio"},
-    "nav_login": {"en": "Log in", "es": "Iniciar sesión"},
-    "nav_logout": {"en": "Log out", "es": "Cerrar sesión"},
-    "nav_dashboard": {"en": "Dashboard", "es": "Panel"},
-    # ----------------------
-    # Generic
-    # ----------------------
-    "hello": {"en": "Hello", "es": "Hola"},
-    # ----------------------
-    # Tenant dashboard
-    # ----------------------
-    "tenant_dashboard_title": {
-        "en": "Tenant dashboard",
-        "es": "Panel de inquilino",
-    },
-    "tenant_rent_for_month": {"en": "Rent for", "es": "Renta de"},
-    "tenant_monthly_rent": {"en": "Monthly rent", "es": "Renta mensual"},
-    "tenant_this_month_paid": {"en": "This month paid", "es": "Pagado este mes"},
-    "tenant_status": {"en": "Status", "es": "Estado"},
-    "tenant_record_payment": {
-        "en": "Record a rent payment",
-        "es": "Registrar un pago de renta",
-    },
-    "tenant_pay_online_heading": {
-        "en": "Pay rent online (card)",
-        "es": "Pagar renta en línea (tarjeta)",
-    },
-    "tenant_pay_online_button": {
-        "en": "Pay with card (Stripe)",
-        "es": "Pagar con tarjeta (Stripe)",
-    },
-    # ----------------------
-    # Landlord dashboard
-    # ----------------------
-    "landlord_dashboard_title": {
-        "en": "Landlord dashboard",
-        "es": "Panel de propietario",
-    },
-    "landlord_open_requests": {
-        "en": "Open maintenance requests",
-        "es": "Solicitudes de mantenimiento abiertas",
-    },
-    "landlord_unpaid_rent": {
-        "en": "Unpaid/partial rent this month",
-        "es": "Renta sin pagar/parcial este mes",
-    },
-    "landlord_manage_tenants": {
-        "en": "Manage tenants",
-        "es": "Gestionar inquilinos",
-    },
-    "landlord_manage_leases": {
-        "en": "Manage leases",
-        "es": "Gestionar contratos",
-    },
-    "landlord_all_requests": {
-        "en": "All maintenance requests",
-        "es": "Todas las solicitudes de mantenimiento",
-    },
-    "landlord_rent_status_for": {
-        "en": "Rent status for",
-        "es": "Estado de la renta de",
-    },
-    "landlord_recent_requests": {
-        "en": "Recent maintenance requests",
-        "es": "Solicitudes de mantenimiento recientes",
-    },
-    "landlord_no_leases": {
-        "en": "No active leases found.",
-        "es": "No se encontraron contratos activos.",
-    },
-    "landlord_no_requests": {
-        "en": "No maintenance requests yet.",
-        "es": "Aún no hay solicitudes de mantenimiento.",
-    },
-    # ----------------------
-    # Table / column labels
-    # ----------------------
-    "col_tenant": {"en": "Tenant", "es": "Inquilino"},
-    "col_monthly_rent": {"en": "Monthly rent", "es": "Renta mensual"},
-    "col_due_day": {"en": "Due day", "es": "Día de vencimiento"},
-    "col_paid_this_month": {"en": "Paid this month", "es": "Pagado este mes"},
-    "col_status": {"en": "Status", "es": "Estado"},
-    "col_created": {"en": "Created", "es": "Creado"},
-    "col_title": {"en": "Title", "es": "Título"},
-    "col_description": {"en": "Description", "es": "Descripción"},
-    "col_update": {"en": "Update", "es": "Actualizar"},
-    "col_priority": {"en": "Priority", "es": "Prioridad"},
-    # ----------------------
-    # Priority labels
-    # ----------------------
-    "priority_low": {"en": "Low", "es": "Baja"},
-    "priority_normal": {"en": "Normal", "es": "Normal"},
-    "priority_high": {"en": "High", "es": "Alta"},
-    "priority_emergency": {"en": "Emergency", "es": "Emergencia"},
-    "label_overdue": {"en": "Overdue", "es": "Atrasado"},
-    # ----------------------
-    # Buttons
-    # ----------------------
-    "btn_save": {"en": "Save", "es": "Guardar"},
-    "btn_submit_request": {"en": "Submit request", "es": "Enviar solicitud"},
-    # ----------------------
-    # Settings
-    # ----------------------
-    "nav_settings": {"en": "Settings", "es": "Configuración"},
-    "settings_title": {"en": "Settings", "es": "Configuración"},
-    "settings_subtitle": {"en": "Manage your account", "es": "Administra tu cuenta"},
-    "settings_profile": {"en": "Profile Information", "es": "Información del perfil"},
-    "settings_password": {"en": "Change Password", "es": "Cambiar contraseña"},
-    "settings_username": {"en": "Username", "es": "Nombre de usuario"},
-    "settings_username_hint": {"en": "Username cannot be changed", "es": "El nombre de usuario no se puede cambiar"},
-    "settings_full_name": {"en": "Full Name", "es": "Nombre completo"},
-    "settings_email": {"en": "Email", "es": "Correo electrónico"},
-    "settings_role": {"en": "Role", "es": "Rol"},
-    "settings_update_profile": {"en": "Update Profile", "es": "Actualizar perfil"},
-    "settings_current_password": {"en": "Current Password", "es": "Contraseña actual"},
-    "settings_new_password": {"en": "New Password", "es": "Nueva contraseña"},
-    "settings_confirm_password": {"en": "Confirm New Password", "es": "Confirmar nueva contraseña"},
-    "settings_change_password": {"en": "Change Password", "es": "Cambiar contraseña"},
-    "back_to_dashboard": {"en": "← Back to Dashboard", "es": "← Volver al panel"},
-    # ----------------------
-    # Calendar
-    # ----------------------
-    "calendar_title": {"en": "Calendar", "es": "Calendario"},
-    "calendar_subtitle": {"en": "View rent due dates, lease dates, and maintenance requests", "es": "Ver fechas de vencimiento de renta, fechas de contrato y solicitudes de mantenimiento"},
-    "calendar_rent_due": {"en": "Rent Due", "es": "Renta vence"},
-    "calendar_lease_start": {"en": "Lease Start", "es": "Inicio de contrato"},
-    "calendar_lease_end": {"en": "Lease End", "es": "Fin de contrato"},
-    "calendar_maintenance_open": {"en": "Maintenance (Open)", "es": "Mantenimiento (Abierto)"},
-    "calendar_maintenance_closed": {"en": "Maintenance (Closed)", "es": "Mantenimiento (Cerrado)"},
-    "calendar_announcement": {"en": "Announcement", "es": "Anuncio"},
-    # ----------------------
-    # Announcements
-    # ----------------------
-    "announcements_title": {"en": "Announcements", "es": "Anuncios"},
-    "announcements_subtitle": {"en": "Post notices for your tenants", "es": "Publica avisos para tus inquilinos"},
-    "announcements_new": {"en": "+ New Announcement", "es": "+ Nuevo anuncio"},
-    "announcements_new_title": {"en": "New Announcement", "es": "Nuevo anuncio"},
-    "announcements_new_subtitle": {"en": "Post a notice to all your tenants", "es": "Publica un aviso para todos tus inquilinos"},
-    "announcements_posted": {"en": "Posted", "es": "Publicado"},
-    "announcements_expires": {"en": "Expires", "es": "Expira"},
-    "announcements_never": {"en": "Never", "es": "Nunca"},
-    "announcements_active": {"en": "Active", "es": "Activo"},
-    "announcements_inactive": {"en": "Inactive", "es": "Inactivo"},
-    "announcements_activate": {"en": "Activate", "es": "Activar"},
-    "announcements_deactivate": {"en": "Deactivate", "es": "Desactivar"},
-    "announcements_delete": {"en": "Delete", "es": "Eliminar"},
-    "announcements_delete_confirm": {"en": "Delete this announcement?", "es": "¿Eliminar este anuncio?"},
-    "announcements_none": {"en": "No announcements yet. Create one to notify your tenants!", "es": "No hay anuncios todavía. ¡Crea uno para notificar a tus inquilinos!"},
-    "announcements_content": {"en": "Content", "es": "Contenido"},
-    "announcements_expires_optional": {"en": "Expires (optional)", "es": "Expira (opcional)"},
-    "announcements_expires_hint": {"en": "Leave empty for no expiration", "es": "Deja vacío para que no expire"},
-    "announcements_post": {"en": "Post Announcement", "es": "Publicar anuncio"},
-    "cancel": {"en": "Cancel", "es": "Cancelar"},
-    "actions": {"en": "Actions", "es": "Acciones"},
-    # ----------------------
-    # Login / Setup / Index
-    # ----------------------
-    "login_title": {"en": "Log in", "es": "Iniciar sesión"},
-    "password": {"en": "Password", "es": "Contraseña"},
-    "username": {"en": "Username", "es": "Nombre de usuario"},
-    "welcome_title": {"en": "Welcome", "es": "Bienvenido"},
-    "welcome_subtitle": {"en": "This is a simple tenant/landlord app.", "es": "Esta es una aplicación simple para inquilinos y propietarios."},
-    "welcome_setup_hint": {"en": "If you haven't set things up yet, go to", "es": "Si aún no has configurado, ve a"},
-    "setup_title": {"en": "Initial setup", "es": "Configuración inicial"},
-    "setup_subtitle": {"en": "Create a landlord, a tenant, and the first lease.", "es": "Crea un propietario, un inquilino y el primer contrato."},
-    "setup_landlord": {"en": "Landlord", "es": "Propietario"},
-    "setup_tenant": {"en": "Tenant", "es": "Inquilino"},
-    "setup_lease": {"en": "Lease", "es": "Contrato"},
-    "setup_full_name": {"en": "Full name", "es": "Nombre completo"},
-    "setup_monthly_rent": {"en": "Monthly rent", "es": "Renta mensual"},
-    "setup_due_day": {"en": "Due day of month", "es": "Día de vencimiento del mes"},
-    "setup_complete": {"en": "Complete setup", "es": "Completar configuración"},
-    "setup": {"en": "setup", "es": "configuración"},
-    # ----------------------
-    # Maintenance Requests
-    # ----------------------
-    "maintenance_requests": {"en": "Maintenance requests", "es": "Solicitudes de mantenimiento"},
-    "maintenance_new": {"en": "New maintenance request", "es": "Nueva solicitud de mantenimiento"},
-    "maintenance_submit_new": {"en": "Submit a new request", "es": "Enviar una nueva solicitud"},
-    "maintenance_none": {"en": "You have no maintenance requests yet.", "es": "Aún no tienes solicitudes de mantenimiento."},
-    "maintenance_image": {"en": "Image", "es": "Imagen"},
-    "maintenance_image_optional": {"en": "Image (optional)", "es": "Imagen (opcional)"},
-    "maintenance_no_image": {"en": "No image", "es": "Sin imagen"},
-    "maintenance_view": {"en": "View", "es": "Ver"},
-    # ----------------------
-    # Rent / Payments
-    # ----------------------
-    "rent_due_on_day": {"en": "due on day", "es": "vence el día"},
-    "rent_each_month": {"en": "each month", "es": "de cada mes"},
-    "rent_record_payment": {"en": "Record payment", "es": "Registrar pago"},
-    "rent_amount": {"en": "Amount", "es": "Monto"},
-    "rent_method": {"en": "Method", "es": "Método"},
-    "rent_note_optional": {"en": "Note (optional)", "es": "Nota (opcional)"},
-    "rent_cash": {"en": "Cash", "es": "Efectivo"},
-    "rent_check": {"en": "Check", "es": "Cheque"},
-    "rent_bank_transfer": {"en": "Bank transfer", "es": "Transferencia bancaria"},
-    "rent_other": {"en": "Other", "es": "Otro"},
-    "rent_stripe_redirect": {"en": "You will be redirected to a secure payment page to pay the remaining balance for this month.", "es": "Serás redirigido a una página de pago segura para pagar el saldo restante de este mes."},
-    "rent_recent_payments": {"en": "Recent rent payments", "es": "Pagos de renta recientes"},
-    "rent_no_payments": {"en": "No rent payments recorded yet.", "es": "No hay pagos de renta registrados todavía."},
-    "rent_no_lease": {"en": "You do not have an active lease. Please contact your landlord.", "es": "No tienes un contrato activo. Por favor contacta a tu propietario."},
-    "rent_paid_at": {"en": "Paid at", "es": "Pagado el"},
-    "rent_month": {"en": "Month", "es": "Mes"},
-    "rent_year": {"en": "Year", "es": "Año"},
-    "rent_note": {"en": "Note", "es": "Nota"},
-    # ----------------------
-    # Status labels
-    # ----------------------
-    "status_paid": {"en": "Paid", "es": "Pagado"},
-    "status_partial": {"en": "Partial", "es": "Parcial"},
-    "status_unpaid": {"en": "Unpaid", "es": "Sin pagar"},
-    "status_open": {"en": "Open", "es": "Abierto"},
-    "status_in_progress": {"en": "In progress", "es": "En progreso"},
-    "status_completed": {"en": "Completed", "es": "Completado"},
-    # ----------------------
-    # Roles
-    # ----------------------
-    "role_tenant": {"en": "Tenant", "es": "Inquilino"},
-    "role_landlord": {"en": "Landlord", "es": "Propietario"},
-    # ----------------------
-    # Landlord pages
-    # ----------------------
-    "leases_title": {"en": "Leases", "es": "Contratos"},
-    "leases_new": {"en": "New lease", "es": "Nuevo contrato"},
-    "leases_start_date": {"en": "Start date", "es": "Fecha de inicio"},
-    "leases_end_date": {"en": "End date", "es": "Fecha de fin"},
-    "leases_active": {"en": "Active", "es": "Activo"},
-    "leases_toggle": {"en": "Toggle", "es": "Cambiar"},
-    "leases_none": {"en": "No leases yet.", "es": "No hay contratos todavía."},
-    "yes": {"en": "Yes", "es": "Sí"},
-    "no": {"en": "No", "es": "No"},
-    "tenants_title": {"en": "Tenants", "es": "Inquilinos"},
-    "tenants_new": {"en": "New tenant", "es": "Nuevo inquilino"},
-    "tenants_none": {"en": "No tenants yet.", "es": "No hay inquilinos todavía."},
-    "tenants_back": {"en": "Back to tenants", "es": "Volver a inquilinos"},
-    "tenants_create": {"en": "Create tenant", "es": "Crear inquilino"},
-    "leases_back": {"en": "Back to leases", "es": "Volver a contratos"},
-    "leases_select_tenant": {"en": "Select tenant...", "es": "Seleccionar inquilino..."},
-    "leases_start_optional": {"en": "Start date (optional)", "es": "Fecha de inicio (opcional)"},
-    "leases_end_optional": {"en": "End date (optional)", "es": "Fecha de fin (opcional)"},
-    "leases_save": {"en": "Save lease", "es": "Guardar contrato"},
-    "last_updated": {"en": "Last updated", "es": "Última actualización"},
-    "maintenance_delete": {"en": "Delete", "es": "Eliminar"},
-    "maintenance_delete_confirm": {"en": "Delete this maintenance request?", "es": "¿Eliminar esta solicitud de mantenimiento?"},
-}
+# UI strings per language, keyed by message id (see translations.json)
+with open(os.path.join(app.root_path, "translations.json"), encoding="utf-8") as translations_file:
+    TRANSLATIONS = json.load(translations_file)
 
 
 def get_lang():
-    lang = session.get("lang") or DEFAULT_LANG
-    if lang not in SUPPORTED_LANGS:
-        lang = DEFAULT_LANG
+    """Return the session language, resolved once per request and cached on g."""
+    lang = g.get("_lang")
+    if lang is None:
+        lang = session.get("lang") or DEFAULT_LANG
+        if lang not in _SUPPORTED_LANGS_SET:
+            lang = DEFAULT_LANG
+        g._lang = lang
     return lang
 
 
+# Flattened (key, lang) -> text lookups built once at import, so each
+# template token is a single dict probe instead of nested .get() calls.
+class _Catalog(dict):
+    """Translation dict that returns unknown keys unchanged."""
+
+    def __missing__(self, key):
+        return key
+
+
+# One flat dict per language with the English fallback (then the key
+# itself) already applied, so a lookup is a single dict access.
+_TRANSLATIONS_BY_LANG = {
+    lang: _Catalog(
+        (key, texts.get(lang) or texts.get(DEFAULT_LANG) or key)
+        for key, texts in TRANSLATIONS.items()
+    )
+    for lang in SUPPORTED_LANGS
+}
+
+
 def translate_ui(key):
     """Return translated UI string for current language."""
-    lang = get_lang()
-    value = TRANSLATIONS.get(key, {})
-    translated = value.get(lang) or value.get(DEFAULT_LANG) or key
-    return translated
+    return _TRANSLATIONS_BY_LANG[get_lang()][key]
 
 
 # DeepL configuration
@@ -406,70 +239,211 @@ DEEPL_API_URL = os.environ.get(
 )
 
 
-def translate_text_deepl(text, target_lang):
+# DeepL accepts repeated "text" fields; keep each request within its
+# documented limits (50 texts, 128 KiB body) with some headroom.
+DEEPL_MAX_TEXTS_PER_REQUEST = 50
+DEEPL_MAX_BYTES_PER_REQUEST = 100 * 1024
+
+
+# Shared session so DeepL calls reuse keep-alive TLS connections, with
+# backoff retries for rate limiting (429) and transient server errors.
+_deepl_session = requests.Session()
+_deepl_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["POST"]),
+            respect_retry_after_header=True,
+        ),
+    ),
+)
+
+
+# In-process LRU of successful DeepL results keyed by (text hash, lang).
+# Translations are deterministic, so repeat renders of the same
+# maintenance descriptions never leave the process.
+DEEPL_CACHE_MAX_ENTRIES = 8192
+_deepl_cache = OrderedDict()
+_deepl_cache_lock = threading.Lock()
+
+
+def _text_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _deepl_cache_key(text, deepl_lang):
+    return _text_hash(text), deepl_lang
+
+
+def _deepl_cache_get(key):
+    with _deepl_cache_lock:
+        translated = _deepl_cache.get(key)
+        if translated is not None:
+            _deepl_cache.move_to_end(key)
+        return translated
+
+
+def _deepl_cache_put(key, translated):
+    with _deepl_cache_lock:
+        _deepl_cache[key] = translated
+        _deepl_cache.move_to_end(key)
+        while len(_deepl_cache) > DEEPL_CACHE_MAX_ENTRIES:
+            _deepl_cache.popitem(last=False)
+
+
+def _translation_cache_fetch(texts, deepl_lang):
+    """Return {text: translated} for texts already stored in the shared
+    Supabase translation_cache table (see supabase_translation_cache.sql)."""
+    supabase = get_supabase()
+    if supabase is None:
+        return {}
+    by_hash = {_text_hash(text): text for text in texts}
+    hashes = list(by_hash)
+    found = {}
+    # Same batch size as the DeepL requests, so the GET URL carrying the
+    # in.(...) hash list stays well under gateway URL limits
+    for start in range(0, len(hashes), DEEPL_MAX_TEXTS_PER_REQUEST):
+        try:
+            resp = (
+                supabase.table("translation_cache")
+                .select("hash, translated")
+                .eq("target_lang", deepl_lang)
+                .in_("hash", hashes[start:start + DEEPL_MAX_TEXTS_PER_REQUEST])
+                .execute()
+            )
+        except Exception as e:
+            logger.warning("Translation cache lookup failed: %s", e)
+            continue
+        for row in (resp.data or []):
+            if row["hash"] in by_hash:
+                found[by_hash[row["hash"]]] = row["translated"]
+    return found
+
+
+def _translation_cache_store(translated_by_text, deepl_lang):
+    """Persist new DeepL results to the shared translation_cache table."""
+    supabase = get_supabase()
+    if supabase is None or not translated_by_text:
+        return
+    rows = [
+        {"hash": _text_hash(text), "target_lang": deepl_lang, "translated": translated}
+        for text, translated in translated_by_text.items()
+    ]
+    try:
+        supabase.table("translation_cache").upsert(
+            rows, on_conflict="hash,target_lang", ignore_duplicates=True, returning="minimal"
+        ).execute()
+    except Exception as e:
+        logger.warning("Translation cache store failed: %s", e)
+
+
+def _deepl_chunks(texts):
+    """Split texts into chunks that respect the DeepL per-request limits."""
+    chunk, size = [], 0
+    for text in texts:
+        text_size = len(text.encode("utf-8"))
+        if chunk and (
+            len(chunk) >= DEEPL_MAX_TEXTS_PER_REQUEST
+            or size + text_size > DEEPL_MAX_BYTES_PER_REQUEST
+        ):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(text)
+        size += text_size
+    if chunk:
+        yield chunk
+
+
+def translate_texts_deepl(texts, target_lang):
     """
-    Translate arbitrary text using DeepL.
-    target_lang: "en" or "es", etc.
+    Translate a list of strings using DeepL, batching them into as few
+    requests as the API limits allow.
+
+    Returns a list the same length as texts; entries are None where the
+    text was empty/whitespace or the translation failed.
     """
-    if not text:
-        return text
+    results = [None] * len(texts)
     if not DEEPL_API_KEY:
         logger.warning("DeepL API key not configured, skipping translation.")
-        return None
+        return results
 
     deepl_lang = target_lang.upper()
-    if deepl_lang == "EN":
-        deepl_lang = "EN"
-    elif deepl_lang == "ES":
-        deepl_lang = "ES"
 
-    logger.debug(
-        "DeepL translation requested to %s for text=%r", deepl_lang, text[:80]
-    )
-    try:
-        resp = requests.post(
-            DEEPL_API_URL,
-            data={
-                "auth_key": DEEPL_API_KEY,
-                "text": text,
-                "target_lang": deepl_lang,
-            },
-            timeout=10,
-        )
-        logger.debug("DeepL response status=%s", resp.status_code)
-        resp.raise_for_status()
-        data = resp.json()
-        translations = data.get("translations")
-        if translations:
-            translated_text = translations[0].get("text")
-            logger.debug(
-                "DeepL translation successful: %r -> %r",
-                text[:60],
-                translated_text[:60] if translated_text else None,
+    # Only send each distinct non-blank, uncached text once, remembering
+    # every position it appeared at.
+    pending_positions = {}
+    for i, text in enumerate(texts):
+        if not text or text.isspace():
+            continue
+        cached = _deepl_cache_get(_deepl_cache_key(text, deepl_lang))
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending_positions.setdefault(text, []).append(i)
+
+    # Second level: translations other workers already paid for.
+    if pending_positions:
+        for text, translated in _translation_cache_fetch(list(pending_positions), deepl_lang).items():
+            for i in pending_positions.pop(text):
+                results[i] = translated
+            _deepl_cache_put(_deepl_cache_key(text, deepl_lang), translated)
+
+    new_translations = {}
+    for chunk in _deepl_chunks(list(pending_positions)):
+        logger.debug("DeepL translation requested to %s for %d text(s)", deepl_lang, len(chunk))
+        try:
+            resp = _deepl_session.post(
+                DEEPL_API_URL,
+                data=[("auth_key", DEEPL_API_KEY), ("target_lang", deepl_lang)]
+                + [("text", text) for text in chunk],
+                timeout=10,
             )
-            return translated_text
-        logger.error("DeepL response missing 'translations': %s", data)
-    except Exception:
-        logger.exception("DeepL translation failed.")
-    return None
+            logger.debug("DeepL response status=%s", resp.status_code)
+            resp.raise_for_status()
+            data = resp.json()
+            translations = data.get("translations")
+            if translations and len(translations) == len(chunk):
+                # DeepL returns translations in request order.
+                for text, item in zip(chunk, translations):
+                    translated = item.get("text")
+                    for i in pending_positions[text]:
+                        results[i] = translated
+                    if translated:
+                        _deepl_cache_put(_deepl_cache_key(text, deepl_lang), translated)
+                        new_translations[text] = translated
+            else:
+                logger.error("DeepL response missing 'translations': %s", data)
+        except Exception:
+            logger.exception("DeepL translation failed.")
+    _translation_cache_store(new_translations, deepl_lang)
+    return results
 
 
 @app.context_processor
 def inject_i18n():
     """Make translation helper and language info available in all templates."""
-    return {"t": translate_ui, "current_lang": get_lang(), "supported_langs": SUPPORTED_LANGS}
+    lang = get_lang()
+    # Bind the catalog once per render so each t() in the template is a
+    # plain dict lookup rather than a translate_ui() -> get_lang() call.
+    return {"t": _TRANSLATIONS_BY_LANG[lang].__getitem__, "current_lang": lang}
 
 
-@app.context_processor
-def inject_app_info():
-    """Make app version available to all templates."""
-    return {"app_version": APP_VERSION}
+# Constants for all templates, set once instead of per render
+app.jinja_env.globals.update(
+    app_version=APP_VERSION,
+    supported_langs=SUPPORTED_LANGS,
+)
 
 
 @app.route("/set-language/<lang>")
 def set_language(lang):
     logger.debug("set_language called with lang=%s", lang)
-    if lang not in SUPPORTED_LANGS:
+    if lang not in _SUPPORTED_LANGS_SET:
         logger.warning("Unsupported language requested: %s", lang)
         flash("Language not supported.", "warning")
         return redirect(
@@ -477,6 +451,7 @@ def set_language(lang):
         )
 
     session["lang"] = lang
+    g.pop("_lang", None)
     logger.info("Language set to %s for current session.", lang)
     ref = request.referrer
     if ref:
@@ -499,23 +474,57 @@ def require_supabase():
     return supabase
 
 
+# Uploads larger than this are streamed from Werkzeug's temporary file
+# instead of being read into memory first.
+UPLOAD_STREAM_THRESHOLD = 512 * 1024
+
+
+def _upload_body(stream):
+    """
+    Return an uploaded file's content in a form storage3 accepts (bytes or
+    FileIO), or None if it is empty. Large uploads are returned as a FileIO
+    on a duplicate of the spooled temp file's descriptor, which httpx then
+    sends in chunks; the caller must close it.
+    """
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    if not size:
+        return None
+    if size <= UPLOAD_STREAM_THRESHOLD:
+        return stream.read()
+    try:
+        fd = os.dup(stream.fileno())
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return stream.read()
+    body = io.FileIO(fd, "rb")
+    body.seek(0)
+    return body
+
+
+def _content_digest(stream):
+    """Return the hex BLAKE2b-128 digest of a stream, read in chunks and rewound."""
+    hasher = hashlib.blake2b(digest_size=16)
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(64 * 1024), b""):
+        hasher.update(chunk)
+    stream.seek(0)
+    return hasher.hexdigest()
+
+
 def upload_image_to_storage(file, filename):
     """
     Upload an image file to Supabase Storage.
+    The object is stored under its content hash, so identical images share
+    one object and re-uploading one is skipped.
     Returns the public URL of the uploaded image, or None on failure.
     """
     try:
         supabase = require_supabase()
         supabase_url = get_supabase_url()
         
-        # Read file content
-        file_content = file.read()
-        if not file_content:
-            logger.warning("Uploaded image is empty for filename=%s", filename)
-            return None
-        
         # Validate file extension
-        ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        ext = filename.rpartition(".")[2].lower() if "." in filename else ""
         if ext not in ALLOWED_IMAGE_EXTENSIONS:
             logger.warning(
                 "Rejected upload with filename=%s ext=%s (not in allowed extensions)",
@@ -523,24 +532,33 @@ def upload_image_to_storage(file, filename):
                 ext,
             )
             return None
-        content_types = {
-            "png": "image/png",
-            "jpg": "image/jpeg",
-            "jpeg": "image/jpeg",
-            "gif": "image/gif",
-            "webp": "image/webp",
-        }
-        content_type = content_types.get(ext, "application/octet-stream")
-        
-        # Upload to Supabase Storage
-        response = supabase.storage.from_(STORAGE_BUCKET).upload(
-            path=filename,
-            file=file_content,
-            file_options={"content-type": content_type}
-        )
-        
-        # Construct public URL
-        public_url = f"{supabase_url}/storage/v1/object/public/{STORAGE_BUCKET}/{filename}"
+        content_type = IMAGE_CONTENT_TYPES.get(ext, "application/octet-stream")
+
+        storage_path = f"{_content_digest(file.stream)}.{ext}"
+        file_content = _upload_body(file.stream)
+        if file_content is None:
+            logger.warning("Uploaded image is empty for filename=%s", filename)
+            return None
+
+        public_url = f"{supabase_url}/storage/v1/object/public/{STORAGE_BUCKET}/{storage_path}"
+
+        # Upload to Supabase Storage (never overwrites; content under a
+        # hash key never changes, so it can be cached for a year)
+        try:
+            supabase.storage.from_(STORAGE_BUCKET).upload(
+                path=storage_path,
+                file=file_content,
+                file_options={"content-type": content_type, "cache-control": "31536000"},
+            )
+        except StorageApiError as e:
+            if str(e.status) != "409":
+                raise
+            logger.info("Image already in Supabase Storage, skipping upload: %s", public_url)
+            return public_url
+        finally:
+            if isinstance(file_content, io.FileIO):
+                file_content.close()
+
         logger.info("Uploaded image to Supabase Storage: %s", public_url)
         return public_url
         
@@ -553,21 +571,27 @@ def upload_image_to_storage(file, filename):
 # Utility Helpers
 # -----------------------
 
+# Columns needed to render pages and check roles. The password hash is
+# deliberately excluded and only fetched where a password is verified.
+USER_COLUMNS = "id, username, role, full_name, email"
+
+
 def get_user(user_id):
-    """Fetch a single user by id from Supabase."""
+    """Fetch a single user by id from Supabase (without the password hash)."""
     try:
         supabase = require_supabase()
         logger.debug("Fetching user by id=%s", user_id)
         resp = (
             supabase.table("users")
-            .select("*")
+            .select(USER_COLUMNS)
             .eq("id", user_id)
             .limit(1)
             .execute()
         )
         rows = resp.data or []
         user = rows[0] if rows else None
-        logger.debug("Fetched user id=%s -> %s", user_id, user)
+        # Never log the full row: it carries the password hash.
+        logger.debug("Fetched user id=%s found=%s", user_id, user is not None)
         return user
     except Exception as e:
         logger.exception("Error fetching user id=%s: %s", user_id, e)
@@ -575,40 +599,138 @@ def get_user(user_id):
 
 
 def get_user_by_username(username):
-    """Fetch a single user by username from Supabase."""
+    """Fetch a single user by username from Supabase, including the password hash for login."""
     try:
         supabase = require_supabase()
         logger.debug("Fetching user with username=%s", username)
         resp = (
             supabase.table("users")
-            .select("*")
+            .select(USER_COLUMNS + ", password")
             .eq("username", username)
             .limit(1)
             .execute()
         )
         rows = resp.data or []
         user = rows[0] if rows else None
-        logger.debug("Fetched user username=%s -> %s", username, user)
+        logger.debug("Fetched user username=%s found=%s", username, user is not None)
         return user
     except Exception as e:
         logger.exception("Error fetching user by username=%s: %s", username, e)
         return None
 
 
+# Tenant list for the landlord tenants page. Reused only while
+# app_data_version() is unchanged (etag_cached keeps it on g), so a tenant
+# created or edited through any worker is picked up on the next request.
+# Without a known version the list is always fetched.
+_tenants_cache = {"version": None, "rows": None}
+_tenants_cache_lock = threading.Lock()
+
+
+def get_tenants():
+    """Return all tenant users (without password hashes), ordered by name."""
+    version = g.get("_data_version")
+    if version:
+        with _tenants_cache_lock:
+            if _tenants_cache["version"] == version:
+                return _tenants_cache["rows"]
+    supabase = require_supabase()
+    resp = (
+        supabase.table("users")
+        .select(USER_COLUMNS)
+        .eq("role", "tenant")
+        .order("full_name")
+        .execute()
+    )
+    rows = resp.data or []
+    if version:
+        with _tenants_cache_lock:
+            _tenants_cache["version"] = version
+            _tenants_cache["rows"] = rows
+    return rows
+
+
+def get_user_password_hash(user_id):
+    """Fetch only the stored password hash for a user."""
+    try:
+        supabase = require_supabase()
+        resp = supabase.table("users").select("password").eq("id", user_id).limit(1).execute()
+        rows = resp.data or []
+        return rows[0]["password"] if rows else None
+    except Exception as e:
+        logger.exception("Error fetching password for user id=%s: %s", user_id, e)
+        return None
+
+
+# Runs independent Supabase queries of one page concurrently, so the page
+# waits for the slowest query rather than the sum of them. Work submitted
+# here runs outside the request context: pass it plain values and keep
+# anything that touches g, session or request on the calling thread.
+_io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="supabase-io")
+
+
+def get_today():
+    """Return today's date, read from the clock once per request."""
+    today = g.get("_today")
+    if today is None:
+        today = g._today = datetime.date.today()
+    return today
+
+
+@lru_cache(maxsize=256)
+def rent_due_dates(today, due_day):
+    """
+    Return the ISO dates rent is due this month and the following 11, with
+    due_day clamped to each month's length. Only depends on the date and
+    the due day, so every lease sharing a due day reuses the same tuple.
+    """
+    dates = []
+    for i in range(12):
+        month = (today.month + i - 1) % 12 + 1
+        year = today.year + ((today.month + i - 1) // 12)
+        last_day = calendar.monthrange(year, month)[1]
+        dates.append(datetime.date(year, month, min(due_day, last_day)).isoformat())
+    return tuple(dates)
+
+
 def get_current_month_year():
-    today = datetime.date.today()
+    today = get_today()
     month_label = today.strftime("%B %Y")
     return today.month, today.year, month_label
 
 
-def get_active_lease_for_tenant(tenant_id):
-    """Get the active lease for a tenant, including landlord/tenant names."""
+LEASE_COLUMNS = "id, tenant_id, landlord_id, monthly_rent, due_day, start_date, end_date, is_active"
+MAINTENANCE_COLUMNS = "id, tenant_id, title, description, status, created_at, priority, image_filename"
+ANNOUNCEMENT_COLUMNS = "id, title, content, is_active, created_at, expires_at"
+RENT_PAYMENT_COLUMNS = "id, lease_id, amount, month, year, status, paid_at, method, note"
+ANALYTICS_COLUMNS = "user_id, browser, os, device_type, screen_width, screen_height, timestamp"
+
+
+def get_active_lease_for_tenant(tenant_id, month=None, year=None):
+    """Get the active lease for a tenant, including landlord/tenant names.
+
+    When month and year are given, the Paid rent for that month is fetched in
+    the same query and returned as lease["rent_paid"].
+    """
     try:
         supabase = require_supabase()
-        # First get the lease
+        # Tenant and landlord names come back embedded in the same request.
+        columns = (
+            LEASE_COLUMNS
+            + ", tenant:users!tenant_id(full_name), landlord:users!landlord_id(full_name)"
+        )
+        query = supabase.table("leases")
+        if month is not None and year is not None:
+            query = (
+                query.select(columns + ", rent_payments(amount)")
+                .eq("rent_payments.month", month)
+                .eq("rent_payments.year", year)
+                .eq("rent_payments.status", "Paid")
+            )
+        else:
+            query = query.select(columns)
         resp = (
-            supabase.table("leases")
-            .select("*")
+            query
             .eq("tenant_id", tenant_id)
             .eq("is_active", True)
             .order("id", desc=True)
@@ -621,18 +743,12 @@ def get_active_lease_for_tenant(tenant_id):
             return None
         
         lease = rows[0]
+        if "rent_payments" in lease:
+            lease["rent_paid"] = sum(p["amount"] for p in (lease.pop("rent_payments") or []))
+        lease["tenant_name"] = (lease.pop("tenant", None) or {}).get("full_name")
+        lease["landlord_name"] = (lease.pop("landlord", None) or {}).get("full_name")
         
-        # Get tenant name
-        tenant_resp = supabase.table("users").select("full_name").eq("id", tenant_id).limit(1).execute()
-        if tenant_resp.data:
-            lease["tenant_name"] = tenant_resp.data[0].get("full_name")
-        
-        # Get landlord name
-        landlord_resp = supabase.table("users").select("full_name").eq("id", lease["landlord_id"]).limit(1).execute()
-        if landlord_resp.data:
-            lease["landlord_name"] = landlord_resp.data[0].get("full_name")
-        
-        logger.debug("Active lease for tenant_id %s: %s", tenant_id, lease)
+        logger.debug("Active lease for tenant_id %s: lease id=%s", tenant_id, lease["id"])
         return lease
     except Exception as e:
         logger.exception("Error fetching active lease for tenant_id=%s: %s", tenant_id, e)
@@ -641,10 +757,14 @@ def get_active_lease_for_tenant(tenant_id):
 
 def allowed_image_file(filename):
     """Return True if the provided filename has an allowed image extension."""
-    if not filename or "." not in filename:
-        return False
-    ext = filename.rsplit(".", 1)[-1].lower()
-    return ext in ALLOWED_IMAGE_EXTENSIONS
+    _, dot, ext = (filename or "").rpartition(".")
+    return bool(dot) and ext.lower() in ALLOWED_IMAGE_EXTENSIONS
+
+
+def form_fields(*names):
+    """Return the stripped values of the given POST form fields, in order."""
+    get = request.form.get
+    return tuple(get(name, "").strip() for name in names)
 
 
 def is_safe_redirect_url(target):
@@ -656,81 +776,96 @@ def is_safe_redirect_url(target):
     return test_url.scheme in ("http", "https") and ref_url.netloc == test_url.netloc
 
 
+# Compiled once at import; password_strength_message runs on every
+# setup / new tenant / change password submission.
+_PW_LOWER_RE = re.compile(r"[a-z]")
+_PW_UPPER_RE = re.compile(r"[A-Z]")
+_PW_DIGIT_RE = re.compile(r"\d")
+_PW_SYMBOL_RE = re.compile(r"[^\w\s]")
+
+
 def password_strength_message(password):
     """Return a validation message if password is weak; otherwise None."""
     if len(password) < PASSWORD_MIN_LENGTH:
         return f"Password must be at least {PASSWORD_MIN_LENGTH} characters."
-    if not re.search(r"[a-z]", password):
+    if not _PW_LOWER_RE.search(password):
         return "Password must include a lowercase letter."
-    if not re.search(r"[A-Z]", password):
+    if not _PW_UPPER_RE.search(password):
         return "Password must include an uppercase letter."
-    if not re.search(r"\d", password):
+    if not _PW_DIGIT_RE.search(password):
         return "Password must include a number."
-    if not re.search(r"[^\w\s]", password):
+    if not _PW_SYMBOL_RE.search(password):
         return "Password must include a symbol."
     return None
 
 
-def get_rent_status_for_lease(lease_id, monthly_rent, month, year):
-    """Calculate rent payment status for a specific lease and month."""
-    try:
-        supabase = require_supabase()
-        resp = (
-            supabase.table("rent_payments")
-            .select("amount, status")
-            .eq("lease_id", lease_id)
-            .eq("month", month)
-            .eq("year", year)
-            .execute()
-        )
-        rows = resp.data or []
-        paid = sum(row["amount"] for row in rows if row.get("status") == "Paid")
-        
-        if paid >= monthly_rent:
-            status = "Paid"
-        elif paid > 0:
-            status = "Partial"
-        else:
-            status = "Unpaid"
-        
-        logger.debug(
-            "Rent status for lease_id=%s month=%s year=%s: paid=%.2f status=%s (monthly_rent=%.2f)",
-            lease_id, month, year, paid, status, monthly_rent,
-        )
-        return paid, status
-    except Exception as e:
-        logger.exception("Error getting rent status for lease_id=%s: %s", lease_id, e)
-        return 0, "Unknown"
+# Prefixes werkzeug puts on hashes it generates; anything else is a legacy
+# plaintext password that predates hashing.
+PASSWORD_HASH_PREFIXES = ("scrypt:", "pbkdf2:", "sha256:")
+
+# Memory-hard scrypt with its cost pinned here rather than following
+# Werkzeug's default, so it only changes deliberately. Hashes made with any
+# other method or cost are re-hashed on the user's next successful login.
+PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+
+
+def hash_password(password):
+    """Hash a password for storage with PASSWORD_HASH_METHOD."""
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
+
+# Hash checked when a login names an unknown user, so that path costs the
+# same as a real password check and response time does not reveal which
+# usernames exist.
+_DUMMY_PASSWORD_HASH = hash_password(secrets.token_urlsafe(16))
+
+
+def verify_password(stored_password, password):
+    """Check a password against the stored value.
+
+    Returns (password_valid, needs_upgrade). needs_upgrade is True when the
+    password matched but is stored as legacy plaintext or with a hash method
+    other than PASSWORD_HASH_METHOD, and should be re-hashed.
+    """
+    if not stored_password:
+        return False, False
+    if stored_password.startswith(PASSWORD_HASH_PREFIXES):
+        password_valid = check_password_hash(stored_password, password)
+        outdated = not stored_password.startswith(PASSWORD_HASH_METHOD + "$")
+        return password_valid, password_valid and outdated
+    # Legacy plaintext: compare in constant time so timing does not leak
+    # how much of the password matched.
+    password_valid = hmac.compare_digest(stored_password.encode("utf-8"), password.encode("utf-8"))
+    return password_valid, password_valid
+
+
+def rent_status_for(paid, monthly_rent):
+    """Classify a month's paid total against the rent owed."""
+    if paid >= monthly_rent:
+        return "Paid"
+    if paid > 0:
+        return "Partial"
+    return "Unpaid"
 
 
 def get_recent_rent_payments_for_tenant(tenant_id, limit=5):
     """Get recent rent payments for a tenant."""
     try:
         supabase = require_supabase()
-        # First get tenant's leases
-        leases_resp = supabase.table("leases").select("id, monthly_rent").eq("tenant_id", tenant_id).execute()
-        leases = leases_resp.data or []
-        
-        if not leases:
-            return []
-        
-        lease_ids = [l["id"] for l in leases]
-        lease_rent_map = {l["id"]: l["monthly_rent"] for l in leases}
-        
-        # Get payments for those leases
+        # Inner-join the lease so the tenant filter runs in the database
+        # and each payment comes back with its lease's monthly_rent.
         payments_resp = (
             supabase.table("rent_payments")
-            .select("*")
-            .in_("lease_id", lease_ids)
+            .select(RENT_PAYMENT_COLUMNS + ", leases!inner(monthly_rent)")
+            .eq("leases.tenant_id", tenant_id)
             .order("paid_at", desc=True)
             .limit(limit)
             .execute()
         )
         payments = payments_resp.data or []
         
-        # Add monthly_rent to each payment
         for p in payments:
-            p["monthly_rent"] = lease_rent_map.get(p["lease_id"], 0)
+            p["monthly_rent"] = (p.pop("leases", None) or {}).get("monthly_rent", 0)
         
         logger.debug("Loaded %d recent rent payments for tenant_id=%s", len(payments), tenant_id)
         return payments
@@ -743,21 +878,34 @@ def get_recent_rent_payments_for_tenant(tenant_id, limit=5):
 # Auth Helpers
 # -----------------------
 
+# Marker for "not looked up yet" so a cached None (no user) is distinguishable.
+_UNSET = object()
+
+
 def get_current_user():
+    """Return the logged-in user, loading it from Supabase at most once per request."""
+    cached = g.get("_current_user", _UNSET)
+    if cached is not _UNSET:
+        return cached
+
     user_id = session.get("user_id")
     if user_id is None:
         logger.debug("No current user in session.")
-        return None
-    user = get_user(user_id)
-    if not user:
-        logger.warning("User id %s from session not found in DB; clearing session.", user_id)
-        session.clear()
-        return None
+        user = None
+    else:
+        user = get_user(user_id)
+        if not user:
+            logger.warning("User id %s from session not found in DB; clearing session.", user_id)
+            session.clear()
+            user = None
+    g._current_user = user
     return user
 
 
 def login_user(user):
     session.clear()
+    g.pop("_lang", None)
+    g._current_user = user
     session["user_id"] = user["id"]
     session["role"] = user["role"]
     session.permanent = True  # Enable session timeout
@@ -774,11 +922,11 @@ def logout_user():
     if user:
         logger.info("User %s (id=%s) logging out.", user["username"], user["id"])
     session.clear()
+    g.pop("_current_user", None)
+    g.pop("_lang", None)
 
 
 def login_required(role=None):
-    from functools import wraps
-
     def decorator(view):
         @wraps(view)
         def wrapped_view(*args, **kwargs):
@@ -797,6 +945,7 @@ def login_required(role=None):
                     request.path,
                 )
                 return redirect(url_for("dashboard"))
+            g.current_user = user
             return view(*args, **kwargs)
 
         return wrapped_view
@@ -804,6 +953,101 @@ def login_required(role=None):
     return decorator
 
 
+# Pages show time-dependent data (current month, overdue flags), so their
+# ETags also roll over every half hour.
+PAGE_ETAG_WINDOW_SECONDS = 1800
+
+
+def get_data_version():
+    """Return the app_data_version() string, or None if it can't be fetched."""
+    try:
+        return get_supabase().rpc("app_data_version").execute().data
+    except Exception:
+        logger.exception("Failed to fetch app data version")
+        return None
+
+
+# Active tenant ids per landlord, valid for a single app_data_version().
+# A lease created or toggled in any worker changes the version, and the
+# first request to see a new version drops every older entry.
+_landlord_tenant_ids_cache = {"version": None, "by_landlord": {}}
+_landlord_tenant_ids_lock = threading.Lock()
+
+
+def get_landlord_tenant_ids(landlord_id):
+    """Return the ids of tenants with an active lease from this landlord."""
+    version = g.get("_data_version")
+    if version:
+        with _landlord_tenant_ids_lock:
+            if _landlord_tenant_ids_cache["version"] == version:
+                cached = _landlord_tenant_ids_cache["by_landlord"].get(landlord_id)
+                if cached is not None:
+                    return cached
+
+    leases_resp = (
+        require_supabase().table("leases")
+        .select("tenant_id")
+        .eq("landlord_id", landlord_id)
+        .eq("is_active", True)
+        .execute()
+    )
+    tenant_ids = list(set(l["tenant_id"] for l in (leases_resp.data or [])))
+    if version:
+        with _landlord_tenant_ids_lock:
+            if _landlord_tenant_ids_cache["version"] != version:
+                _landlord_tenant_ids_cache["version"] = version
+                _landlord_tenant_ids_cache["by_landlord"] = {}
+            _landlord_tenant_ids_cache["by_landlord"][landlord_id] = tenant_ids
+    return tenant_ids
+
+
+def etag_cached(view):
+    """
+    Answer repeat visits with 304 Not Modified while the data behind the page
+    is unchanged, skipping the view's queries and template rendering.
+    Must be applied below login_required.
+    """
+    @wraps(view)
+    def wrapped_view(*args, **kwargs):
+        # Pending flash messages are part of the page, so always render
+        if session.get("_flashes"):
+            return view(*args, **kwargs)
+        # Forms on the page carry the session's CSRF token, which is reset on
+        # login/logout; without one yet the page has to be rendered anyway
+        csrf_token = session.get("csrf_token")
+        if not csrf_token:
+            return view(*args, **kwargs)
+        version = g._data_version = get_data_version()
+        if not version:
+            return view(*args, **kwargs)
+
+        etag = hashlib.blake2b(
+            "{}:{}:{}:{}:{}:{}".format(
+                request.full_path,
+                g.current_user["id"],
+                get_lang(),
+                int(time.time() // PAGE_ETAG_WINDOW_SECONDS),
+                version,
+                csrf_token,
+            ).encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+
+        if request.if_none_match.contains(etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            # Error pages, redirects and pages missing translations must
+            # not be revalidated into a 304
+            if response.status_code != 200 or g.get("_translation_incomplete"):
+                return response
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
+    return wrapped_view
+
+
 # -----------------------
 # Routes: Core / Auth
 # -----------------------
@@ -817,35 +1061,46 @@ def index():
     return render_template("index.html")
 
 
+# Set once users exist; setup is a one-time operation per deployment.
+_setup_completed = False
+
+
 @app.route("/setup", methods=["GET", "POST"])
 @limiter.limit("5 per minute")  # Prevent abuse
 def setup():
     """Initial setup route to create a landlord and a tenant."""
     logger.debug("Setup route accessed with method=%s", request.method)
     
+    global _setup_completed
     try:
         supabase = require_supabase()
         
-        # Check if users already exist
-        existing = supabase.table("users").select("id").limit(1).execute()
-        if existing.data:
+        # Check if users already exist. Once they do, setup can never be
+        # needed again, so later visits skip the database probe.
+        if not _setup_completed:
+            existing = supabase.table("users").select("id").limit(1).execute()
+            _setup_completed = bool(existing.data)
+        if _setup_completed:
             logger.info("Setup attempted but users already exist; redirecting to index.")
             flash("Setup has already been completed.", "info")
             return redirect(url_for("index"))
         
         if request.method == "POST":
-            landlord_username = request.form.get("landlord_username", "").strip()
-            landlord_password = request.form.get("landlord_password", "").strip()
-            landlord_full_name = request.form.get("landlord_full_name", "").strip()
-            landlord_email = request.form.get("landlord_email", "").strip()
+            landlord_username, landlord_password, landlord_full_name, landlord_email = form_fields(
+                "landlord_username",
+                "landlord_password",
+                "landlord_full_name",
+                "landlord_email",
+            )
 
-            tenant_username = request.form.get("tenant_username", "").strip()
-            tenant_password = request.form.get("tenant_password", "").strip()
-            tenant_full_name = request.form.get("tenant_full_name", "").strip()
-            tenant_email = request.form.get("tenant_email", "").strip()
+            tenant_username, tenant_password, tenant_full_name, tenant_email = form_fields(
+                "tenant_username",
+                "tenant_password",
+                "tenant_full_name",
+                "tenant_email",
+            )
 
-            monthly_rent_raw = request.form.get("monthly_rent", "").strip()
-            due_day_raw = request.form.get("due_day", "").strip()
+            monthly_rent_raw, due_day_raw = form_fields("monthly_rent", "due_day")
 
             logger.debug(
                 "Setup form submitted with landlord_username=%s, tenant_username=%s",
@@ -879,37 +1134,31 @@ def setup():
                 return render_template("setup.html")
 
             try:
-                # Create landlord
-                landlord_resp = supabase.table("users").insert({
-                    "username": landlord_username,
-                    "password": generate_password_hash(landlord_password),
-                    "role": "landlord",
-                    "full_name": landlord_full_name or None,
-                    "email": landlord_email or None,
-                }).execute()
-                landlord_id = landlord_resp.data[0]["id"]
-
-                # Create tenant
-                tenant_resp = supabase.table("users").insert({
-                    "username": tenant_username,
-                    "password": generate_password_hash(tenant_password),
-                    "role": "tenant",
-                    "full_name": tenant_full_name or None,
-                    "email": tenant_email or None,
-                }).execute()
-                tenant_id = tenant_resp.data[0]["id"]
-
-                # Create lease
-                today = datetime.date.today().isoformat()
-                supabase.table("leases").insert({
-                    "tenant_id": tenant_id,
-                    "landlord_id": landlord_id,
-                    "monthly_rent": monthly_rent,
-                    "due_day": due_day,
-                    "start_date": today,
-                    "is_active": True,
+                # Landlord, tenant and lease are created in one transaction
+                # (see supabase_functions.sql)
+                setup_resp = supabase.rpc("setup_initial", {
+                    "p_landlord": {
+                        "username": landlord_username,
+                        "password": hash_password(landlord_password),
+                        "full_name": landlord_full_name or None,
+                        "email": landlord_email or None,
+                    },
+                    "p_tenant": {
+                        "username": tenant_username,
+                        "password": hash_password(tenant_password),
+                        "full_name": tenant_full_name or None,
+                        "email": tenant_email or None,
+                    },
+                    "p_lease": {
+                        "monthly_rent": monthly_rent,
+                        "due_day": due_day,
+                        "start_date": get_today().isoformat(),
+                    },
                 }).execute()
+                landlord_id = setup_resp.data[0]["landlord_id"]
+                tenant_id = setup_resp.data[0]["tenant_id"]
 
+                _setup_completed = True
                 logger.info("Setup completed with landlord id=%s and tenant id=%s", landlord_id, tenant_id)
                 flash("Setup completed. You can now log in.", "success")
                 return redirect(url_for("login"))
@@ -930,33 +1179,23 @@ def setup():
 def login():
     logger.debug("Login route accessed with method=%s", request.method)
     if request.method == "POST":
-        username = request.form.get("username", "").strip()
-        password = request.form.get("password", "").strip()
+        username, password = form_fields("username", "password")
         logger.debug("Login attempt for username=%s", username)
         user = get_user_by_username(username)
         
-        if user:
-            stored_password = user["password"]
-            password_valid = False
-            needs_upgrade = False
-            
-            # Check if password is hashed (starts with hash algorithm identifier)
-            if stored_password.startswith(("scrypt:", "pbkdf2:", "sha256:")):
-                # Verify hashed password
-                password_valid = check_password_hash(stored_password, password)
-            else:
-                # Legacy plaintext password check
-                password_valid = (stored_password == password)
-                needs_upgrade = password_valid  # Upgrade if correct
+        if not user:
+            check_password_hash(_DUMMY_PASSWORD_HASH, password)
+        else:
+            password_valid, needs_upgrade = verify_password(user["password"], password)
             
             if password_valid:
-                # Upgrade plaintext password to hashed (one-time migration)
+                # Re-hash plaintext or outdated hashes (one-time migration)
                 if needs_upgrade:
                     try:
                         supabase = require_supabase()
-                        new_hash = generate_password_hash(password)
-                        supabase.table("users").update({"password": new_hash}).eq("id", user["id"]).execute()
-                        logger.info("Upgraded password to hashed for user id=%s", user["id"])
+                        new_hash = hash_password(password)
+                        supabase.table("users").update({"password": new_hash}, returning="minimal").eq("id", user["id"]).execute()
+                        logger.info("Upgraded password hash for user id=%s", user["id"])
                     except Exception as e:
                         logger.warning("Failed to upgrade password for user id=%s: %s", user["id"], e)
                 
@@ -989,7 +1228,7 @@ def logout():
 @app.route("/dashboard")
 @login_required()
 def dashboard():
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Dashboard requested by user id=%s role=%s", user["id"], user["role"])
     if user["role"] == "landlord":
         return redirect(url_for("landlord_dashboard"))
@@ -1004,7 +1243,7 @@ def dashboard():
 @login_required()
 def settings():
     """Display user settings page."""
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Settings page requested by user id=%s", user["id"])
     return render_template("settings.html", user=user)
 
@@ -1013,9 +1252,8 @@ def settings():
 @login_required()
 def update_profile():
     """Update user profile information."""
-    user = get_current_user()
-    full_name = request.form.get("full_name", "").strip()
-    email = request.form.get("email", "").strip()
+    user = g.current_user
+    full_name, email = form_fields("full_name", "email")
     
     logger.debug("Profile update for user id=%s: full_name=%s, email=%s", user["id"], full_name, email)
     
@@ -1024,7 +1262,7 @@ def update_profile():
         supabase.table("users").update({
             "full_name": full_name or None,
             "email": email or None,
-        }).eq("id", user["id"]).execute()
+        }, returning="minimal").eq("id", user["id"]).execute()
         
         logger.info("Profile updated for user id=%s", user["id"])
         flash("Profile updated successfully.", "success")
@@ -1040,10 +1278,12 @@ def update_profile():
 @login_required()
 def change_password():
     """Change user password."""
-    user = get_current_user()
-    current_password = request.form.get("current_password", "").strip()
-    new_password = request.form.get("new_password", "").strip()
-    confirm_password = request.form.get("confirm_password", "").strip()
+    user = g.current_user
+    current_password, new_password, confirm_password = form_fields(
+        "current_password",
+        "new_password",
+        "confirm_password",
+    )
     
     logger.debug("Password change attempt for user id=%s", user["id"])
     
@@ -1062,13 +1302,7 @@ def change_password():
         return redirect(url_for("settings"))
     
     # Verify current password
-    stored_password = user["password"]
-    password_valid = False
-    
-    if stored_password.startswith(("scrypt:", "pbkdf2:", "sha256:")):
-        password_valid = check_password_hash(stored_password, current_password)
-    else:
-        password_valid = (stored_password == current_password)
+    password_valid, _ = verify_password(get_user_password_hash(user["id"]), current_password)
     
     if not password_valid:
         logger.warning("Password change failed for user id=%s: incorrect current password", user["id"])
@@ -1078,8 +1312,8 @@ def change_password():
     # Update password
     try:
         supabase = require_supabase()
-        new_hash = generate_password_hash(new_password)
-        supabase.table("users").update({"password": new_hash}).eq("id", user["id"]).execute()
+        new_hash = hash_password(new_password)
+        supabase.table("users").update({"password": new_hash}, returning="minimal").eq("id", user["id"]).execute()
         
         logger.info("Password changed for user id=%s", user["id"])
         flash("Password changed successfully.", "success")
@@ -1098,47 +1332,56 @@ def _apply_deepl_and_overdue(rows):
     """
     Process maintenance request rows, attach translated_description (for ES)
     and is_overdue flag based on age + status.
+
+    Rows are the dicts returned by Supabase and are updated in place; the
+    same list is returned for convenience.
     """
     lang = get_lang()
-    now = datetime.datetime.utcnow()
-    processed = []
-
-    for r in rows:
-        r_dict = dict(r) if hasattr(r, "keys") else r
+    # Open/In progress requests created at or before this are overdue. The
+    # "YYYY-MM-DDTHH:MM:SS" UTC form lets ISO strings be compared as text.
+    overdue_cutoff_ts = time.time() - 7 * 86400
+    overdue_cutoff_iso = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(overdue_cutoff_ts))
+
+    # DeepL translation only when viewing in Spanish, in one batch per page
+    translations = None
+    if lang == "es" and rows:
+        translations = translate_texts_deepl(
+            [r.get("description") for r in rows], target_lang="es"
+        )
 
-        # DeepL translation only when viewing in Spanish
-        if lang == "es":
-            desc = r_dict.get("description")
-            if desc:
-                translated = translate_text_deepl(desc, target_lang="es")
-                if translated:
-                    r_dict["translated_description"] = translated
+    for i, r in enumerate(rows):
+        if translations and translations[i]:
+            r["translated_description"] = translations[i]
+        elif translations is not None and DEEPL_API_KEY and (r.get("description") or "").strip():
+            # DeepL failed for this row; keep the page out of ETag caching
+            # so it is re-rendered once translations work again
+            g._translation_incomplete = True
 
         # Overdue logic: Open/In progress older than 7 days
-        r_dict["is_overdue"] = False
-        created_at_str = r_dict.get("created_at")
-        status = r_dict.get("status")
-        if created_at_str and status in ("Open", "In progress"):
+        r["is_overdue"] = False
+        created_at_str = r.get("created_at")
+        if r.get("status") in OVERDUE_STATUSES and created_at_str and isinstance(created_at_str, str):
             try:
-                # Handle ISO format from Supabase
-                if isinstance(created_at_str, str):
-                    created_at_str = created_at_str.replace("Z", "+00:00")
-                    created_dt = datetime.datetime.fromisoformat(created_at_str.replace(" ", "T"))
-                    if created_dt.tzinfo:
-                        created_dt = created_dt.replace(tzinfo=None)
-                    age_days = (now - created_dt).days
-                    if age_days >= 7:
-                        r_dict["is_overdue"] = True
+                if created_at_str[10:11] == "T" and created_at_str.endswith(("+00:00", "Z")):
+                    # UTC timestamp as PostgREST returns it: compare as text
+                    r["is_overdue"] = created_at_str[:19] <= overdue_cutoff_iso
+                else:
+                    # Anything else is parsed (fromisoformat accepts a
+                    # space separator, but "Z" only from Python 3.11)
+                    if created_at_str.endswith("Z"):
+                        created_at_str = created_at_str[:-1] + "+00:00"
+                    created_dt = datetime.datetime.fromisoformat(created_at_str)
+                    if created_dt.tzinfo is None:
+                        created_dt = created_dt.replace(tzinfo=datetime.timezone.utc)
+                    r["is_overdue"] = created_dt.timestamp() <= overdue_cutoff_ts
             except Exception:
                 logger.exception(
                     "Failed to parse created_at for maintenance request id=%s value=%r",
-                    r_dict.get("id"), created_at_str,
+                    r.get("id"), created_at_str,
                 )
 
-        processed.append(r_dict)
-
-    logger.debug("Processed %d maintenance requests for DeepL/overdue (lang=%s).", len(processed), lang)
-    return processed
+    logger.debug("Processed %d maintenance requests for DeepL/overdue (lang=%s).", len(rows), lang)
+    return rows
 
 
 # -----------------------
@@ -1148,39 +1391,43 @@ def _apply_deepl_and_overdue(rows):
 @app.route("/tenant")
 @login_required(role="tenant")
 def tenant_dashboard():
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Loading tenant dashboard for tenant id=%s", user["id"])
 
     try:
         supabase = require_supabase()
-        
-        # Maintenance requests
-        requests_resp = (
+        month, year, month_label = get_current_month_year()
+
+        # The four queries below are independent, so run them concurrently
+        requests_future = _io_pool.submit(
             supabase.table("maintenance_requests")
-            .select("*")
+            .select(MAINTENANCE_COLUMNS)
             .eq("tenant_id", user["id"])
             .order("created_at", desc=True)
-            .execute()
+            .execute
         )
-        requests_rows = requests_resp.data or []
+        lease_future = _io_pool.submit(get_active_lease_for_tenant, user["id"], month, year)
+        payments_future = _io_pool.submit(get_recent_rent_payments_for_tenant, user["id"], limit=5)
+        announcements_future = _io_pool.submit(get_announcements_for_tenant, user["id"])
+
+        # Maintenance requests
+        requests_rows = requests_future.result().data or []
         requests_for_view = _apply_deepl_and_overdue(requests_rows)
 
         # Rent info
-        month, year, month_label = get_current_month_year()
-        lease = get_active_lease_for_tenant(user["id"])
+        lease = lease_future.result()
         rent_paid = 0
         rent_status = None
         recent_payments = []
         if lease:
-            rent_paid, rent_status = get_rent_status_for_lease(
-                lease["id"], lease["monthly_rent"], month, year
-            )
-            recent_payments = get_recent_rent_payments_for_tenant(user["id"], limit=5)
+            rent_paid = lease["rent_paid"]
+            rent_status = rent_status_for(rent_paid, lease["monthly_rent"])
+            recent_payments = payments_future.result()
         else:
             logger.warning("No active lease found for tenant id=%s", user["id"])
 
         # Get announcements from landlord
-        announcements = get_announcements_for_tenant(user["id"])
+        announcements = announcements_future.result()
 
         return render_template(
             "tenant_dashboard.html",
@@ -1202,10 +1449,9 @@ def tenant_dashboard():
 @app.route("/tenant/request/new", methods=["GET", "POST"])
 @login_required(role="tenant")
 def new_request():
-    user = get_current_user()
+    user = g.current_user
     if request.method == "POST":
-        title = request.form.get("title", "").strip()
-        description = request.form.get("description", "").strip()
+        title, description = form_fields("title", "description")
         priority = request.form.get("priority", "Normal").strip() or "Normal"
         image_file = request.files.get("image")
         image_filename = None
@@ -1214,8 +1460,7 @@ def new_request():
             user["id"], title, priority,
         )
 
-        allowed_priorities = {"Low", "Normal", "High", "Emergency"}
-        if priority not in allowed_priorities:
+        if priority not in MAINTENANCE_PRIORITIES:
             logger.warning("Invalid priority '%s' supplied, defaulting to 'Normal'.", priority)
             priority = "Normal"
 
@@ -1231,8 +1476,7 @@ def new_request():
             image_url = None
             if image_file and image_file.filename:
                 safe_name = secure_filename(image_file.filename)
-                storage_filename = f"{uuid.uuid4().hex}_{safe_name}"
-                image_url = upload_image_to_storage(image_file, storage_filename)
+                image_url = upload_image_to_storage(image_file, safe_name)
                 if image_url:
                     logger.debug(
                         "Uploaded maintenance request image for tenant id=%s to %s",
@@ -1253,12 +1497,17 @@ def new_request():
                     "status": "Open",
                     "priority": priority,
                     "image_filename": image_url,  # Now stores the full URL
-                }).execute()
+                }, returning="minimal").execute()
                 
                 logger.info(
                     "Maintenance request created for tenant id=%s with title='%s' priority='%s'",
                     user["id"], title, priority,
                 )
+                # Translate the description now, off the request thread, so
+                # dashboards viewed in Spanish find it already cached
+                # instead of waiting on DeepL.
+                if DEEPL_API_KEY:
+                    _io_pool.submit(translate_texts_deepl, [description], "es")
                 flash("Request submitted!", "success")
                 return redirect(url_for("tenant_dashboard"))
             except Exception as e:
@@ -1271,7 +1520,7 @@ def new_request():
 @app.route("/tenant/rent/pay", methods=["POST"])
 @login_required(role="tenant")
 def tenant_pay_rent():
-    user = get_current_user()
+    user = g.current_user
     amount_raw = request.form.get("amount", "").strip()
     method = request.form.get("method", "").strip() or "Recorded in app"
     note = request.form.get("note", "").strip()
@@ -1310,7 +1559,7 @@ def tenant_pay_rent():
             "status": "Paid",
             "method": method,
             "note": note or None,
-        }).execute()
+        }, returning="minimal").execute()
         
         logger.info(
             "Recorded rent payment for tenant id=%s, lease_id=%s, amount=%.2f, month=%s, year=%s",
@@ -1335,7 +1584,7 @@ def tenant_stripe_checkout():
     Start a Stripe Checkout session for the tenant's current month's rent.
     The amount charged is the remaining balance for the current month.
     """
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Tenant id=%s requested Stripe rent checkout", user["id"])
 
     if not STRIPE_SECRET_KEY or not STRIPE_PUBLISHABLE_KEY:
@@ -1346,7 +1595,9 @@ def tenant_stripe_checkout():
         flash("Online payments are not configured. Please contact your landlord.", "danger")
         return redirect(url_for("tenant_dashboard"))
 
-    lease = get_active_lease_for_tenant(user["id"])
+    # Lease and this month's Paid total in one request
+    month, year, month_label = get_current_month_year()
+    lease = get_active_lease_for_tenant(user["id"], month, year)
     if not lease:
         logger.warning(
             "Tenant id=%s attempted Stripe payment but has no active lease", user["id"]
@@ -1354,10 +1605,8 @@ def tenant_stripe_checkout():
         flash("No active lease found. Please contact your landlord.", "danger")
         return redirect(url_for("tenant_dashboard"))
 
-    month, year, month_label = get_current_month_year()
-    rent_paid, rent_status = get_rent_status_for_lease(
-        lease["id"], lease["monthly_rent"], month, year
-    )
+    rent_paid = lease["rent_paid"]
+    rent_status = rent_status_for(rent_paid, lease["monthly_rent"])
     amount_due = (lease["monthly_rent"] or 0) - (rent_paid or 0)
     logger.debug(
         "Stripe checkout calculation for tenant id=%s lease_id=%s month=%s year=%s: "
@@ -1377,6 +1626,7 @@ def tenant_stripe_checkout():
             user["id"], lease["id"], amount_due, amount_cents,
         )
 
+        product_name = f"Rent for {month_label} (Lease #{lease['id']})"
         checkout_session = stripe.checkout.Session.create(
             payment_method_types=["card"],
             mode="payment",
@@ -1384,9 +1634,7 @@ def tenant_stripe_checkout():
                 {
                     "price_data": {
                         "currency": "usd",
-                        "product_data": {
-                            "name": f"Rent for {month_label} (Lease #{lease['id']})"
-                        },
+                        "product_data": {"name": product_name},
                         "unit_amount": amount_cents,
                     },
                     "quantity": 1,
@@ -1400,6 +1648,11 @@ def tenant_stripe_checkout():
             },
             success_url=url_for("tenant_stripe_success", _external=True),
             cancel_url=url_for("tenant_stripe_cancel", _external=True),
+            # A double-click or retry for the same balance gets the same
+            # session back from Stripe instead of creating a second one.
+            idempotency_key=(
+                f"rent-checkout-{user['id']}-{lease['id']}-{year}-{month}-{amount_cents}"
+            ),
         )
 
         logger.info(
@@ -1421,7 +1674,7 @@ def tenant_stripe_success():
     Landing page when Stripe Checkout reports success in the browser.
     The authoritative record is still the Stripe webhook; this route is only UX.
     """
-    user = get_current_user()
+    user = g.current_user
     logger.info("Tenant id=%s returned from Stripe success URL", user["id"])
     flash("Payment completed. Your rent status will update shortly.", "success")
     return redirect(url_for("tenant_dashboard"))
@@ -1433,7 +1686,7 @@ def tenant_stripe_cancel():
     """
     Landing page when the tenant cancels the Stripe Checkout flow.
     """
-    user = get_current_user()
+    user = g.current_user
     logger.info("Tenant id=%s returned from Stripe cancel URL", user["id"])
     flash("Payment was cancelled. No charges were made.", "warning")
     return redirect(url_for("tenant_dashboard"))
@@ -1446,7 +1699,8 @@ def stripe_webhook():
     Stripe webhook endpoint to record successful card payments into rent_payments.
     Configure this in your Stripe dashboard with STRIPE_WEBHOOK_SECRET.
     """
-    payload = request.data
+    # Read the raw body once without Flask keeping a second cached copy.
+    payload = request.get_data(cache=False)
     sig_header = request.headers.get("Stripe-Signature", "")
     logger.debug("Stripe webhook received. Signature header=%s", sig_header)
 
@@ -1470,10 +1724,11 @@ def stripe_webhook():
 
     if event["type"] == "checkout.session.completed":
         session_obj = event["data"]["object"]
-        logger.debug(
-            "Processing checkout.session.completed: %s",
-            json.dumps(session_obj, indent=2),
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Processing checkout.session.completed: %s",
+                json.dumps(session_obj, indent=2),
+            )
 
         metadata = session_obj.get("metadata") or {}
         tenant_id = metadata.get("tenant_id")
@@ -1487,34 +1742,57 @@ def stripe_webhook():
             tenant_id, lease_id, month, year, amount_total,
         )
 
+        if not (tenant_id and lease_id and month and year and amount_total is not None):
+            logger.error(
+                "Missing required metadata in Stripe webhook for rent payment: %s",
+                metadata,
+            )
+            return "OK", 200
+
+        # Bad metadata will never parse on a retry either, so acknowledge it
         try:
-            if not (tenant_id and lease_id and month and year and amount_total is not None):
-                logger.error(
-                    "Missing required metadata in Stripe webhook for rent payment: %s",
-                    metadata,
-                )
-            else:
-                supabase = require_supabase()
-                amount = float(amount_total) / 100.0
-                month_int = int(month)
-                year_int = int(year)
+            amount = float(amount_total) / 100.0
+            lease_id_int = int(lease_id)
+            month_int = int(month)
+            year_int = int(year)
+        except (TypeError, ValueError):
+            logger.error(
+                "Invalid metadata in Stripe webhook for rent payment: %s (amount_total=%s)",
+                metadata, amount_total,
+            )
+            return "OK", 200
 
-                supabase.table("rent_payments").insert({
-                    "lease_id": int(lease_id),
+        session_id = session_obj.get("id")
+        try:
+            supabase = require_supabase()
+            # Keyed on the Checkout session id, so Stripe's at-least-once
+            # delivery (and our own 500-triggered retries) record the
+            # payment exactly once.
+            supabase.table("rent_payments").upsert(
+                {
+                    "lease_id": lease_id_int,
                     "amount": amount,
                     "month": month_int,
                     "year": year_int,
                     "status": "Paid",
                     "method": "Stripe",
-                    "note": f"Stripe Checkout session {session_obj.get('id')}",
-                }).execute()
-                
-                logger.info(
-                    "Rent payment recorded from Stripe webhook: lease_id=%s amount=%.2f month=%s year=%s",
-                    lease_id, amount, month_int, year_int,
-                )
+                    "note": f"Stripe Checkout session {session_id}",
+                    "stripe_session_id": session_id,
+                },
+                on_conflict="stripe_session_id",
+                ignore_duplicates=True,
+                returning="minimal",
+            ).execute()
         except Exception:
             logger.exception("Failed to record rent payment from Stripe webhook.")
+            # Non-2xx makes Stripe retry the event later; safe because the
+            # write above is idempotent.
+            return "Failed to record payment", 500
+
+        logger.info(
+            "Rent payment recorded from Stripe webhook: lease_id=%s amount=%.2f month=%s year=%s",
+            lease_id, amount, month_int, year_int,
+        )
     else:
         logger.debug("Unhandled Stripe event type: %s", event["type"])
 
@@ -1527,22 +1805,26 @@ def stripe_webhook():
 
 @app.route("/landlord")
 @login_required(role="landlord")
+@etag_cached
 def landlord_dashboard():
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Loading landlord dashboard for landlord id=%s", user["id"])
 
     try:
         supabase = require_supabase()
         
-        # Get all tenant IDs for this landlord's active leases
-        leases_resp = (
-            supabase.table("leases")
-            .select("tenant_id")
-            .eq("landlord_id", user["id"])
-            .eq("is_active", True)
-            .execute()
-        )
-        tenant_ids = [l["tenant_id"] for l in (leases_resp.data or [])]
+        month, year, month_label = get_current_month_year()
+
+        # Active leases with tenant names and this month's Paid total,
+        # aggregated in the database (see supabase_functions.sql). The same
+        # rows feed the maintenance list and the rent overview below.
+        leases_full_resp = supabase.rpc(
+            "landlord_rent_overview",
+            {"p_landlord_id": user["id"], "p_month": month, "p_year": year},
+        ).execute()
+        leases_full = leases_full_resp.data or []
+        tenant_map = {l["tenant_id"]: l["tenant_display"] for l in leases_full}
+        tenant_ids = list(tenant_map)
         
         # Maintenance requests for landlord's tenants
         requests_for_view = []
@@ -1551,7 +1833,7 @@ def landlord_dashboard():
         if tenant_ids:
             requests_resp = (
                 supabase.table("maintenance_requests")
-                .select("*")
+                .select(MAINTENANCE_COLUMNS)
                 .in_("tenant_id", tenant_ids)
                 .order("created_at", desc=True)
                 .execute()
@@ -1559,83 +1841,29 @@ def landlord_dashboard():
             requests_rows = requests_resp.data or []
             
             # Add tenant names
-            users_resp = supabase.table("users").select("id, full_name, username").in_("id", tenant_ids).execute()
-            user_map = {u["id"]: u for u in (users_resp.data or [])}
-            
             for r in requests_rows:
-                tenant = user_map.get(r["tenant_id"], {})
-                r["tenant_name"] = tenant.get("full_name")
-                r["tenant_username"] = tenant.get("username")
+                r["tenant_name"] = tenant_map.get(r["tenant_id"])
             
             requests_for_view = _apply_deepl_and_overdue(requests_rows)
             open_count = sum(1 for r in requests_rows if r.get("status") == "Open")
 
         # Rent overview for current month
-        month, year, month_label = get_current_month_year()
         logger.debug("Calculating rent overview for landlord id=%s month=%s year=%s", user["id"], month, year)
 
-        rent_overview = []
-        unpaid_count = 0
-        
-        # Get all active leases with tenant info
-        leases_full_resp = (
-            supabase.table("leases")
-            .select("id, tenant_id, monthly_rent, due_day")
-            .eq("landlord_id", user["id"])
-            .eq("is_active", True)
-            .execute()
-        )
-        leases_full = leases_full_resp.data or []
-        
-        if leases_full:
-            lease_ids = [l["id"] for l in leases_full]
-            tenant_ids_full = list(set(l["tenant_id"] for l in leases_full))
-            
-            # Get tenant names
-            tenants_resp = supabase.table("users").select("id, full_name, username").in_("id", tenant_ids_full).execute()
-            tenant_map = {t["id"]: t for t in (tenants_resp.data or [])}
-            
-            # Get payments for this month
-            payments_resp = (
-                supabase.table("rent_payments")
-                .select("lease_id, amount, status")
-                .in_("lease_id", lease_ids)
-                .eq("month", month)
-                .eq("year", year)
-                .execute()
-            )
-            payments = payments_resp.data or []
-            
-            # Sum payments by lease
-            paid_by_lease = {}
-            for p in payments:
-                if p.get("status") == "Paid":
-                    paid_by_lease[p["lease_id"]] = paid_by_lease.get(p["lease_id"], 0) + p["amount"]
-            
-            for lease in leases_full:
-                tenant = tenant_map.get(lease["tenant_id"], {})
-                monthly_rent = lease["monthly_rent"]
-                paid_amount = paid_by_lease.get(lease["id"], 0)
-                
-                if paid_amount >= monthly_rent:
-                    status = "Paid"
-                elif paid_amount > 0:
-                    status = "Partial"
-                else:
-                    status = "Unpaid"
-                
-                if status != "Paid":
-                    unpaid_count += 1
-                
-                rent_overview.append({
-                    "tenant_name": tenant.get("full_name") or tenant.get("username"),
-                    "monthly_rent": monthly_rent,
-                    "due_day": lease["due_day"],
-                    "paid_amount": paid_amount,
-                    "status": status,
-                })
-
-        rent_last_updated = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+        # Paid/Partial/Unpaid status is computed by landlord_rent_overview.
+        rent_overview = [
+            {
+                "tenant_name": lease["tenant_display"],
+                "monthly_rent": lease["monthly_rent"],
+                "due_day": lease["due_day"],
+                "paid_amount": lease["paid_amount"],
+                "status": lease["status"],
+            }
+            for lease in leases_full
+        ]
+        unpaid_count = sum(1 for row in rent_overview if row["status"] != "Paid")
+
+        rent_last_updated = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
         logger.debug(
             "Rent overview for landlord id=%s: %d leases, %d unpaid/partial (generated %s)",
             user["id"], len(rent_overview), unpaid_count, rent_last_updated,
@@ -1659,33 +1887,27 @@ def landlord_dashboard():
 
 @app.route("/landlord/leases")
 @login_required(role="landlord")
+@etag_cached
 def landlord_leases():
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Landlord leases view for landlord id=%s", user["id"])
 
     try:
         supabase = require_supabase()
         
-        # Get leases
+        # Leases with the tenant's name embedded in the same request
         leases_resp = (
             supabase.table("leases")
-            .select("*")
+            .select(LEASE_COLUMNS + ", tenant:users!tenant_id(full_name, username)")
             .eq("landlord_id", user["id"])
             .order("is_active", desc=True)
             .execute()
         )
         leases = leases_resp.data or []
-        
-        # Get tenant names
-        if leases:
-            tenant_ids = list(set(l["tenant_id"] for l in leases))
-            tenants_resp = supabase.table("users").select("id, full_name, username").in_("id", tenant_ids).execute()
-            tenant_map = {t["id"]: t for t in (tenants_resp.data or [])}
-            
-            for lease in leases:
-                tenant = tenant_map.get(lease["tenant_id"], {})
-                lease["tenant_name"] = tenant.get("full_name")
-                lease["tenant_username"] = tenant.get("username")
+        for lease in leases:
+            tenant = lease.pop("tenant", None) or {}
+            lease["tenant_name"] = tenant.get("full_name")
+            lease["tenant_username"] = tenant.get("username")
 
         return render_template("landlord_leases.html", user=user, leases=leases)
     except Exception as e:
@@ -1697,21 +1919,14 @@ def landlord_leases():
 @app.route("/landlord/leases/new", methods=["GET", "POST"])
 @login_required(role="landlord")
 def landlord_new_lease():
-    user = get_current_user()
+    user = g.current_user
     logger.debug("New lease route accessed by landlord id=%s method=%s", user["id"], request.method)
 
     try:
         supabase = require_supabase()
         
         # Get all tenants
-        tenants_resp = (
-            supabase.table("users")
-            .select("*")
-            .eq("role", "tenant")
-            .order("full_name")
-            .execute()
-        )
-        tenants = tenants_resp.data or []
+        tenants = get_tenants()
 
         if request.method == "POST":
             tenant_id_raw = request.form.get("tenant_id")
@@ -1742,7 +1957,7 @@ def landlord_new_lease():
                 "start_date": start_date,
                 "end_date": end_date,
                 "is_active": True,
-            }).execute()
+            }, returning="minimal").execute()
             
             logger.info("New lease created by landlord id=%s for tenant_id=%s", user["id"], tenant_id)
             flash("Lease created.", "success")
@@ -1758,32 +1973,23 @@ def landlord_new_lease():
 @app.route("/landlord/leases/<int:lease_id>/toggle", methods=["POST"])
 @login_required(role="landlord")
 def landlord_toggle_lease(lease_id):
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Toggle lease id=%s requested by landlord id=%s", lease_id, user["id"])
 
     try:
         supabase = require_supabase()
         
-        # Get the lease
-        lease_resp = (
-            supabase.table("leases")
-            .select("*")
-            .eq("id", lease_id)
-            .eq("landlord_id", user["id"])
-            .limit(1)
-            .execute()
-        )
-        leases = lease_resp.data or []
+        # Flip is_active in a single atomic update (see supabase_functions.sql)
+        rows = supabase.rpc(
+            "toggle_lease_active", {"p_lease_id": lease_id, "p_landlord_id": user["id"]}
+        ).execute().data or []
         
-        if not leases:
+        if not rows:
             logger.warning("Lease id=%s not found or not owned by landlord id=%s", lease_id, user["id"])
             flash("Lease not found.", "danger")
             return redirect(url_for("landlord_leases"))
 
-        lease = leases[0]
-        new_status = not lease["is_active"]
-        
-        supabase.table("leases").update({"is_active": new_status}).eq("id", lease_id).execute()
+        new_status = rows[0]["new_is_active"]
         
         logger.info("Lease id=%s toggled by landlord id=%s to is_active=%s", lease_id, user["id"], new_status)
         flash("Lease status updated.", "success")
@@ -1796,20 +2002,13 @@ def landlord_toggle_lease(lease_id):
 
 @app.route("/landlord/tenants")
 @login_required(role="landlord")
+@etag_cached
 def landlord_tenants():
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Landlord tenants view for landlord id=%s", user["id"])
 
     try:
-        supabase = require_supabase()
-        tenants_resp = (
-            supabase.table("users")
-            .select("*")
-            .eq("role", "tenant")
-            .order("full_name")
-            .execute()
-        )
-        tenants = tenants_resp.data or []
+        tenants = get_tenants()
         return render_template("landlord_tenants.html", user=user, tenants=tenants)
     except Exception as e:
         logger.exception("Error loading tenants: %s", e)
@@ -1820,14 +2019,16 @@ def landlord_tenants():
 @app.route("/landlord/tenants/new", methods=["GET", "POST"])
 @login_required(role="landlord")
 def landlord_new_tenant():
-    user = get_current_user()
+    user = g.current_user
     logger.debug("New tenant route accessed by landlord id=%s method=%s", user["id"], request.method)
 
     if request.method == "POST":
-        username = request.form.get("username", "").strip()
-        password = request.form.get("password", "").strip()
-        full_name = request.form.get("full_name", "").strip()
-        email = request.form.get("email", "").strip()
+        username, password, full_name, email = form_fields(
+            "username",
+            "password",
+            "full_name",
+            "email",
+        )
 
         logger.debug("New tenant submission: username=%s, full_name=%s, email=%s", username, full_name, email)
 
@@ -1844,11 +2045,11 @@ def landlord_new_tenant():
             supabase = require_supabase()
             supabase.table("users").insert({
                 "username": username,
-                "password": generate_password_hash(password),
+                "password": hash_password(password),
                 "role": "tenant",
                 "full_name": full_name or None,
                 "email": email or None,
-            }).execute()
+            }, returning="minimal").execute()
             
             logger.info("New tenant %s created by landlord id=%s", username, user["id"])
             flash("Tenant created.", "success")
@@ -1862,42 +2063,31 @@ def landlord_new_tenant():
 
 @app.route("/landlord/requests")
 @login_required(role="landlord")
+@etag_cached
 def landlord_requests():
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Landlord requests view for landlord id=%s", user["id"])
 
     try:
         supabase = require_supabase()
         
-        # Get tenant IDs for this landlord
-        leases_resp = (
-            supabase.table("leases")
-            .select("tenant_id")
-            .eq("landlord_id", user["id"])
-            .eq("is_active", True)
-            .execute()
-        )
-        tenant_ids = list(set(l["tenant_id"] for l in (leases_resp.data or [])))
+        tenant_ids = get_landlord_tenant_ids(user["id"])
         
         requests_for_view = []
         
         if tenant_ids:
-            # Get maintenance requests
+            # Maintenance requests with the tenant's name embedded
             requests_resp = (
                 supabase.table("maintenance_requests")
-                .select("*")
+                .select(MAINTENANCE_COLUMNS + ", tenant:users!tenant_id(full_name, username)")
                 .in_("tenant_id", tenant_ids)
                 .order("created_at", desc=True)
                 .execute()
             )
             requests_rows = requests_resp.data or []
             
-            # Get tenant names
-            tenants_resp = supabase.table("users").select("id, full_name, username").in_("id", tenant_ids).execute()
-            tenant_map = {t["id"]: t for t in (tenants_resp.data or [])}
-            
             for r in requests_rows:
-                tenant = tenant_map.get(r["tenant_id"], {})
+                tenant = r.pop("tenant", None) or {}
                 r["tenant_name"] = tenant.get("full_name")
                 r["tenant_username"] = tenant.get("username")
             
@@ -1913,21 +2103,21 @@ def landlord_requests():
 @app.route("/landlord/requests/<int:request_id>/status", methods=["POST"])
 @login_required(role="landlord")
 def landlord_update_request_status(request_id):
-    user = get_current_user()
+    user = g.current_user
     new_status = request.form.get("status", "").strip()
     logger.debug(
         "Landlord id=%s updating maintenance request id=%s to status=%s",
         user["id"], request_id, new_status,
     )
 
-    if new_status not in ["Open", "In progress", "Completed"]:
+    if new_status not in MAINTENANCE_STATUSES:
         logger.warning("Invalid status %s provided for request id=%s", new_status, request_id)
         flash("Invalid status.", "warning")
         return redirect(url_for("landlord_requests"))
 
     try:
         supabase = require_supabase()
-        supabase.table("maintenance_requests").update({"status": new_status}).eq("id", request_id).execute()
+        supabase.table("maintenance_requests").update({"status": new_status}, returning="minimal").eq("id", request_id).execute()
         
         logger.info(
             "Maintenance request id=%s updated to status=%s by landlord id=%s",
@@ -1945,24 +2135,18 @@ def landlord_update_request_status(request_id):
 @login_required(role="landlord")
 def landlord_delete_request(request_id):
     """Delete a maintenance request."""
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Landlord id=%s deleting maintenance request id=%s", user["id"], request_id)
 
     try:
         supabase = require_supabase()
         
-        # Verify the request belongs to one of this landlord's tenants
-        leases_resp = (
-            supabase.table("leases")
-            .select("tenant_id")
-            .eq("landlord_id", user["id"])
-            .execute()
-        )
-        tenant_ids = [l["tenant_id"] for l in (leases_resp.data or [])]
+        # Ownership check and delete happen in one statement (see supabase_functions.sql)
+        deleted = supabase.rpc(
+            "delete_maintenance_request", {"p_request_id": request_id, "p_landlord_id": user["id"]}
+        ).execute().data
         
-        if tenant_ids:
-            # Delete the request if it belongs to one of the landlord's tenants
-            supabase.table("maintenance_requests").delete().eq("id", request_id).in_("tenant_id", tenant_ids).execute()
+        if deleted:
             logger.info("Maintenance request id=%s deleted by landlord id=%s", request_id, user["id"])
             flash("Maintenance request deleted.", "success")
         else:
@@ -1978,24 +2162,43 @@ def landlord_delete_request(request_id):
 # Announcements
 # -----------------------
 
+ANNOUNCEMENTS_PAGE_SIZE = 25
+
+
 @app.route("/landlord/announcements")
 @login_required(role="landlord")
 def landlord_announcements():
     """View and manage announcements."""
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Announcements page for landlord id=%s", user["id"])
     
+    page = max(request.args.get("page", 1, type=int), 1)
+    offset = (page - 1) * ANNOUNCEMENTS_PAGE_SIZE
+    
     try:
         supabase = require_supabase()
+        # One page of rows plus the total count (Prefer: count=exact)
         resp = (
             supabase.table("announcements")
-            .select("*")
+            .select(ANNOUNCEMENT_COLUMNS, count="exact")
             .eq("landlord_id", user["id"])
             .order("created_at", desc=True)
+            .range(offset, offset + ANNOUNCEMENTS_PAGE_SIZE - 1)
             .execute()
         )
         announcements = resp.data or []
-        return render_template("landlord_announcements.html", user=user, announcements=announcements)
+        total_count = resp.count or 0
+        total_pages = max(-(-total_count // ANNOUNCEMENTS_PAGE_SIZE), 1)
+        if page > total_pages:
+            return redirect(url_for("landlord_announcements", page=total_pages))
+        return render_template(
+            "landlord_announcements.html",
+            user=user,
+            announcements=announcements,
+            page=page,
+            total_pages=total_pages,
+            total_count=total_count,
+        )
     except Exception as e:
         logger.exception("Error loading announcements: %s", e)
         flash("Error loading announcements.", "danger")
@@ -2006,11 +2209,10 @@ def landlord_announcements():
 @login_required(role="landlord")
 def landlord_new_announcement():
     """Create a new announcement."""
-    user = get_current_user()
+    user = g.current_user
     
     if request.method == "POST":
-        title = request.form.get("title", "").strip()
-        content = request.form.get("content", "").strip()
+        title, content = form_fields("title", "content")
         expires_at = request.form.get("expires_at", "").strip() or None
         
         if not title or not content:
@@ -2025,7 +2227,7 @@ def landlord_new_announcement():
                 "content": content,
                 "is_active": True,
                 "expires_at": expires_at,
-            }).execute()
+            }, returning="minimal").execute()
             
             logger.info("Announcement created by landlord id=%s: %s", user["id"], title)
             flash("Announcement posted!", "success")
@@ -2041,27 +2243,21 @@ def landlord_new_announcement():
 @login_required(role="landlord")
 def landlord_toggle_announcement(announcement_id):
     """Toggle announcement active status."""
-    user = get_current_user()
+    user = g.current_user
     
     try:
         supabase = require_supabase()
         
-        # Get current status
-        resp = (
-            supabase.table("announcements")
-            .select("is_active")
-            .eq("id", announcement_id)
-            .eq("landlord_id", user["id"])
-            .limit(1)
-            .execute()
-        )
+        rows = supabase.rpc(
+            "toggle_announcement_active",
+            {"p_announcement_id": announcement_id, "p_landlord_id": user["id"]},
+        ).execute().data or []
         
-        if not resp.data:
+        if not rows:
             flash("Announcement not found.", "danger")
             return redirect(url_for("landlord_announcements"))
         
-        new_status = not resp.data[0]["is_active"]
-        supabase.table("announcements").update({"is_active": new_status}).eq("id", announcement_id).execute()
+        new_status = rows[0]["new_is_active"]
         
         logger.info("Announcement id=%s toggled to is_active=%s", announcement_id, new_status)
         flash("Announcement updated.", "success")
@@ -2076,11 +2272,11 @@ def landlord_toggle_announcement(announcement_id):
 @login_required(role="landlord")
 def landlord_delete_announcement(announcement_id):
     """Delete an announcement."""
-    user = get_current_user()
+    user = g.current_user
     
     try:
         supabase = require_supabase()
-        supabase.table("announcements").delete().eq("id", announcement_id).eq("landlord_id", user["id"]).execute()
+        supabase.table("announcements").delete(returning="minimal").eq("id", announcement_id).eq("landlord_id", user["id"]).execute()
         
         logger.info("Announcement id=%s deleted by landlord id=%s", announcement_id, user["id"])
         flash("Announcement deleted.", "success")
@@ -2109,27 +2305,18 @@ def get_announcements_for_tenant(tenant_id):
         if not landlord_ids:
             return []
         
-        # Get active announcements from those landlords
-        now = datetime.datetime.utcnow().isoformat()
+        # Get active, unexpired announcements from those landlords
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
         resp = (
             supabase.table("announcements")
-            .select("*")
+            .select(ANNOUNCEMENT_COLUMNS)
             .in_("landlord_id", landlord_ids)
             .eq("is_active", True)
+            .or_(f"expires_at.is.null,expires_at.gt.{now}")
             .order("created_at", desc=True)
             .execute()
         )
-        
-        # Filter out expired announcements
-        announcements = []
-        for a in (resp.data or []):
-            if a.get("expires_at"):
-                if a["expires_at"] > now:
-                    announcements.append(a)
-            else:
-                announcements.append(a)
-        
-        return announcements
+        return resp.data or []
     except Exception as e:
         logger.exception("Error fetching announcements for tenant id=%s: %s", tenant_id, e)
         return []
@@ -2143,40 +2330,62 @@ def get_announcements_for_tenant(tenant_id):
 @login_required()
 def calendar_view():
     """Display calendar view with events."""
-    user = get_current_user()
+    user = g.current_user
     logger.debug("Calendar view for user id=%s role=%s", user["id"], user["role"])
     return render_template("calendar.html", user=user)
 
 
+def _rent_due_events(title, due_day):
+    """Calendar events for the next 12 rent due dates of a lease."""
+    return [
+        {"title": title, "start": due_date, "color": "#e74c3c", "type": "rent_due"}
+        for due_date in rent_due_dates(get_today(), due_day)
+    ]
+
+
+def _maintenance_events(rows, tenant_map=None):
+    """
+    Calendar events for maintenance requests, on the day they were filed.
+    With a tenant_map (tenant_id -> name) titles also name the tenant.
+    """
+    for r in rows:
+        if not r.get("created_at"):
+            continue
+        if tenant_map is None:
+            title = f"🔧 {r['title']}"
+        else:
+            title = f"🔧 {tenant_map.get(r['tenant_id']) or 'Tenant'}: {r['title']}"
+        yield {
+            "title": title,
+            "start": r["created_at"][:10],
+            "color": "#3498db" if r["status"] == "Open" else "#95a5a6",
+            "type": "maintenance"
+        }
+
+
 @app.route("/api/calendar-events")
 @login_required()
+@etag_cached
 def calendar_events():
     """API endpoint returning calendar events as JSON."""
-    user = get_current_user()
+    user = g.current_user
     events = []
     
     try:
         supabase = require_supabase()
         
         if user["role"] == "tenant":
-            # Get tenant's lease info
+            # Lease and maintenance requests are independent; fetch both at once
+            requests_future = _io_pool.submit(
+                supabase.table("maintenance_requests")
+                .select("id, title, created_at, status")
+                .eq("tenant_id", user["id"])
+                .execute
+            )
             lease = get_active_lease_for_tenant(user["id"])
             if lease:
                 # Rent due dates (for next 12 months)
-                today = datetime.date.today()
-                for i in range(12):
-                    month = (today.month + i - 1) % 12 + 1
-                    year = today.year + ((today.month + i - 1) // 12)
-                    last_day = calendar.monthrange(year, month)[1]
-                    due_day = min(lease["due_day"], last_day)
-                    due_date = datetime.date(year, month, due_day)
-                    
-                    events.append({
-                        "title": f"Rent Due (${lease['monthly_rent']:.0f})",
-                        "start": due_date.isoformat(),
-                        "color": "#e74c3c",
-                        "type": "rent_due"
-                    })
+                events.extend(_rent_due_events(f"Rent Due (${lease['monthly_rent']:.0f})", lease["due_day"]))
                 
                 # Lease dates
                 if lease.get("start_date"):
@@ -2195,60 +2404,25 @@ def calendar_events():
                     })
             
             # Maintenance requests
-            requests_resp = (
-                supabase.table("maintenance_requests")
-                .select("id, title, created_at, status")
-                .eq("tenant_id", user["id"])
-                .execute()
-            )
-            for r in (requests_resp.data or []):
-                created = r["created_at"][:10] if r.get("created_at") else None
-                if created:
-                    color = "#3498db" if r["status"] == "Open" else "#95a5a6"
-                    events.append({
-                        "title": f"🔧 {r['title']}",
-                        "start": created,
-                        "color": color,
-                        "type": "maintenance"
-                    })
+            events.extend(_maintenance_events(requests_future.result().data or []))
         
         else:  # Landlord
-            # Get all active leases
-            leases_resp = (
-                supabase.table("leases")
-                .select("id, tenant_id, monthly_rent, due_day, start_date, end_date")
-                .eq("landlord_id", user["id"])
-                .eq("is_active", True)
-                .execute()
-            )
-            leases = leases_resp.data or []
-            
-            # Get tenant names
-            tenant_ids = list(set(l["tenant_id"] for l in leases))
-            if tenant_ids:
-                tenants_resp = supabase.table("users").select("id, full_name, username").in_("id", tenant_ids).execute()
-                tenant_map = {t["id"]: t.get("full_name") or t.get("username") for t in (tenants_resp.data or [])}
-            else:
-                tenant_map = {}
+            # Active leases (with tenant names), their tenants' maintenance
+            # requests and the landlord's announcements in one round trip
+            # (see supabase_functions.sql)
+            payload = supabase.rpc(
+                "calendar_payload_for_landlord", {"p_landlord_id": user["id"]}
+            ).execute().data or {}
+            leases = payload.get("leases") or []
+            tenant_map = {l["tenant_id"]: l["tenant_display"] for l in leases}
             
-            today = datetime.date.today()
             for lease in leases:
-                tenant_name = tenant_map.get(lease["tenant_id"], "Tenant")
+                tenant_name = tenant_map.get(lease["tenant_id"]) or "Tenant"
                 
                 # Rent due dates (next 12 months)
-                for i in range(12):
-                    month = (today.month + i - 1) % 12 + 1
-                    year = today.year + ((today.month + i - 1) // 12)
-                    last_day = calendar.monthrange(year, month)[1]
-                    due_day = min(lease["due_day"], last_day)
-                    due_date = datetime.date(year, month, due_day)
-                    
-                    events.append({
-                        "title": f"💰 {tenant_name} (${lease['monthly_rent']:.0f})",
-                        "start": due_date.isoformat(),
-                        "color": "#e74c3c",
-                        "type": "rent_due"
-                    })
+                events.extend(
+                    _rent_due_events(f"💰 {tenant_name} (${lease['monthly_rent']:.0f})", lease["due_day"])
+                )
                 
                 # Lease dates
                 if lease.get("end_date"):
@@ -2260,33 +2434,10 @@ def calendar_events():
                     })
             
             # Maintenance requests from tenants
-            if tenant_ids:
-                requests_resp = (
-                    supabase.table("maintenance_requests")
-                    .select("id, tenant_id, title, created_at, status")
-                    .in_("tenant_id", tenant_ids)
-                    .execute()
-                )
-                for r in (requests_resp.data or []):
-                    created = r["created_at"][:10] if r.get("created_at") else None
-                    if created:
-                        tenant_name = tenant_map.get(r["tenant_id"], "Tenant")
-                        color = "#3498db" if r["status"] == "Open" else "#95a5a6"
-                        events.append({
-                            "title": f"🔧 {tenant_name}: {r['title']}",
-                            "start": created,
-                            "color": color,
-                            "type": "maintenance"
-                        })
+            events.extend(_maintenance_events(payload.get("requests") or [], tenant_map))
             
             # Announcements
-            announcements_resp = (
-                supabase.table("announcements")
-                .select("id, title, created_at")
-                .eq("landlord_id", user["id"])
-                .execute()
-            )
-            for a in (announcements_resp.data or []):
+            for a in (payload.get("announcements") or []):
                 created = a["created_at"][:10] if a.get("created_at") else None
                 if created:
                     events.append({
@@ -2300,7 +2451,7 @@ def calendar_events():
 
     except Exception as e:
         logger.exception("Error fetching calendar events: %s", e)
-        return {"events": [], "error": str(e)}
+        return {"events": [], "error": str(e)}, 500
 
 
 @app.route("/api/log-analytics", methods=["POST"])
@@ -2338,8 +2489,8 @@ def log_analytics():
         try:
             logger.info("Attempting to insert analytics for user %s: %s %s on %s",
                        user_id, data.get("browser"), data.get("os"), data.get("device_type"))
-            result = supabase.table("analytics").insert(analytics_data).execute()
-            logger.info("Analytics logged successfully for user %s, result: %s", user_id, result)
+            supabase.table("analytics").insert(analytics_data, returning="minimal").execute()
+            logger.info("Analytics logged successfully for user %s", user_id)
             return {"status": "success"}, 200
         except Exception as db_error:
             # Log the full error for debugging
@@ -2411,7 +2562,7 @@ def test_analytics():
 @login_required()
 def analytics_dashboard():
     """View analytics dashboard (landlords only)."""
-    user = get_current_user()
+    user = g.current_user
 
     # Only landlords can view analytics
     if user["role"] != "landlord":
@@ -2426,7 +2577,7 @@ def analytics_dashboard():
             # Get analytics for all users (landlord can see all)
             analytics_resp = (
                 supabase.table("analytics")
-                .select("*")
+                .select(ANALYTICS_COLUMNS)
                 .order("timestamp", desc=True)
                 .limit(500)
                 .execute()
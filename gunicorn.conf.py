@@ -0,0 +1,35 @@
+# Gunicorn settings, picked up automatically by `gunicorn app:app`.
+#
+# Most of a request's time is spent waiting on Supabase, Stripe or DeepL over
+# HTTPS, so each worker runs several threads: while one request waits on the
+# network, the others keep being served. Every value can be overridden via
+# the environment.
+import multiprocessing
+import os
+
+# Loopback by default, like gunicorn itself; PaaS hosts that inject PORT (or
+# an explicit GUNICORN_BIND) get a public bind.
+if os.environ.get("GUNICORN_BIND"):
+    bind = os.environ["GUNICORN_BIND"]
+elif os.environ.get("PORT"):
+    bind = "0.0.0.0:" + os.environ["PORT"]
+else:
+    bind = "127.0.0.1:8000"
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+# Import the app once in the master so workers fork with templates,
+# translations and config already loaded.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+
+def post_fork(server, worker):
+    # Pooled connections can't be shared across processes (supabase_client
+    # drops the inherited client at fork), so build this worker's client now
+    # rather than on its first request.
+    from supabase_client import init_supabase
+
+    init_supabase()
@@ -16,9 +16,20 @@ CREATE TABLE IF NOT EXISTS announcements (
 );
 
 -- Indexes
-CREATE INDEX IF NOT EXISTS idx_announcements_landlord_id ON announcements(landlord_id);
+-- Landlord announcements page: newest first, one page at a time. Also
+-- serves plain landlord_id lookups, so the single-column index is dropped.
+DROP INDEX IF EXISTS idx_announcements_landlord_id;
+CREATE INDEX IF NOT EXISTS idx_announcements_landlord_created ON announcements(landlord_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_announcements_active ON announcements(is_active);
 CREATE INDEX IF NOT EXISTS idx_announcements_created_at ON announcements(created_at DESC);
+-- Tenant dashboard: a landlord's active, unexpired announcements
+CREATE INDEX IF NOT EXISTS idx_announcements_landlord_active_expires ON announcements(landlord_id, expires_at) WHERE is_active;
+
+-- Change tracking for app_data_version() (supabase_functions.sql); the
+-- bump_app_data_version() trigger function is created in supabase_schema.sql
+DROP TRIGGER IF EXISTS trg_announcements_data_version ON announcements;
+CREATE TRIGGER trg_announcements_data_version AFTER INSERT OR UPDATE OR DELETE ON announcements
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_app_data_version();
 
 -- RLS Policy
 ALTER TABLE announcements ENABLE ROW LEVEL SECURITY;
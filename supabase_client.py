@@ -1,8 +1,10 @@
 import logging
 import os
+import threading
 from typing import Optional
 
-from supabase import Client, create_client
+import httpx
+from supabase import Client, ClientOptions, create_client
 
 logger = logging.getLogger(__name__)
 
@@ -21,26 +23,41 @@ SUPABASE_KEY = (
 # Storage bucket name for maintenance images
 STORAGE_BUCKET = "maintenance-images"
 
+# Connection pool shared by the PostgREST, Storage and Auth sub-clients, so
+# every request reuses warm keep-alive connections instead of each sub-client
+# opening its own.
+HTTP_POOL_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_POOL_MAX_CONNECTIONS", "20"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.environ.get("SUPABASE_POOL_MAX_KEEPALIVE", "10"))
+HTTP_TIMEOUT_SECONDS = float(os.environ.get("SUPABASE_HTTP_TIMEOUT", "15"))
+
 
 def get_supabase_url() -> Optional[str]:
     """Return the Supabase project URL."""
     return SUPABASE_URL
 
 _supabase_client: Optional[Client] = None
+_supabase_client_lock = threading.Lock()
 
 
 def init_supabase() -> Optional[Client]:
     """
     Initialize a singleton Supabase client.
 
-    This logs useful debug info but never logs your keys.
+    Safe to call from several threads at once: only one of them builds the
+    client. This logs useful debug info but never logs your keys.
     """
-    global _supabase_client
-
     if _supabase_client is not None:
-        logger.debug("Supabase client already initialized.")
         return _supabase_client
 
+    with _supabase_client_lock:
+        if _supabase_client is not None:
+            return _supabase_client
+        return _create_supabase_client()
+
+
+def _create_supabase_client() -> Optional[Client]:
+    global _supabase_client
+
     if not SUPABASE_URL:
         logger.error("SUPABASE_URL / NEXT_PUBLIC_SUPABASE_URL is not set.")
         return None
@@ -55,7 +72,20 @@ def init_supabase() -> Optional[Client]:
 
     try:
         logger.info("Initializing Supabase client.")
-        client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=5.0),
+            follow_redirects=True,
+            http2=True,
+        )
+        client = create_client(
+            SUPABASE_URL,
+            SUPABASE_KEY,
+            options=ClientOptions(httpx_client=http_client),
+        )
         _supabase_client = client
         logger.info("Supabase client initialized successfully.")
         return client
@@ -64,11 +94,28 @@ def init_supabase() -> Optional[Client]:
         return None
 
 
+def _reset_after_fork() -> None:
+    """
+    Drop the inherited client in a forked child (e.g. gunicorn --preload).
+
+    The parent's pooled connections must not be shared across processes, so
+    each worker lazily builds its own client on first use.
+    """
+    global _supabase_client, _supabase_client_lock
+    _supabase_client = None
+    _supabase_client_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 def get_supabase() -> Optional[Client]:
     """
     Helper to get the Supabase client, with debug logging.
     """
-    client = init_supabase()
+    client = _supabase_client
     if client is None:
-        logger.error("Supabase client not available. Check environment variables.")
+        client = init_supabase()
+        if client is None:
+            logger.error("Supabase client not available. Check environment variables.")
     return client
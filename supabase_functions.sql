@@ -0,0 +1,241 @@
+-- ============================================
+-- Supabase Database Functions (called via RPC)
+-- ============================================
+-- Run this SQL in your Supabase SQL Editor AFTER running supabase_schema.sql
+-- ============================================
+
+-- ============================================
+-- INITIAL SETUP
+-- ============================================
+-- Creates the first landlord, tenant and their lease in one transaction,
+-- so a failed setup never leaves half-created rows behind. Refuses to run
+-- once any user exists.
+CREATE OR REPLACE FUNCTION setup_initial(
+    p_landlord JSONB,
+    p_tenant JSONB,
+    p_lease JSONB
+)
+RETURNS TABLE (
+    landlord_id INTEGER,
+    tenant_id INTEGER
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_landlord_id INTEGER;
+    v_tenant_id INTEGER;
+BEGIN
+    IF EXISTS (SELECT 1 FROM users) THEN
+        RAISE EXCEPTION 'Setup has already been completed';
+    END IF;
+
+    INSERT INTO users (username, password, role, full_name, email)
+    VALUES (
+        p_landlord->>'username', p_landlord->>'password', 'landlord',
+        p_landlord->>'full_name', p_landlord->>'email'
+    )
+    RETURNING id INTO v_landlord_id;
+
+    INSERT INTO users (username, password, role, full_name, email)
+    VALUES (
+        p_tenant->>'username', p_tenant->>'password', 'tenant',
+        p_tenant->>'full_name', p_tenant->>'email'
+    )
+    RETURNING id INTO v_tenant_id;
+
+    INSERT INTO leases (tenant_id, landlord_id, monthly_rent, due_day, start_date, is_active)
+    VALUES (
+        v_tenant_id, v_landlord_id,
+        (p_lease->>'monthly_rent')::NUMERIC,
+        (p_lease->>'due_day')::INTEGER,
+        (p_lease->>'start_date')::DATE,
+        TRUE
+    );
+
+    RETURN QUERY SELECT v_landlord_id, v_tenant_id;
+END;
+$$;
+
+-- ============================================
+-- LANDLORD RENT OVERVIEW
+-- ============================================
+-- One row per active lease of a landlord with the tenant's display name
+-- (full name, falling back to username), the total Paid rent for the given
+-- month and its Paid/Partial/Unpaid status, all computed in the database.
+-- (Dropped first because CREATE OR REPLACE cannot change the result columns.)
+DROP FUNCTION IF EXISTS landlord_rent_overview(INTEGER, INTEGER, INTEGER);
+CREATE OR REPLACE FUNCTION landlord_rent_overview(
+    p_landlord_id INTEGER,
+    p_month INTEGER,
+    p_year INTEGER
+)
+RETURNS TABLE (
+    lease_id INTEGER,
+    tenant_id INTEGER,
+    tenant_display TEXT,
+    monthly_rent NUMERIC,
+    due_day INTEGER,
+    paid_amount NUMERIC,
+    status TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        l.id,
+        l.tenant_id,
+        COALESCE(NULLIF(u.full_name, ''), u.username),
+        l.monthly_rent,
+        l.due_day,
+        COALESCE(SUM(rp.amount), 0),
+        CASE
+            WHEN COALESCE(SUM(rp.amount), 0) >= l.monthly_rent THEN 'Paid'
+            WHEN COALESCE(SUM(rp.amount), 0) > 0 THEN 'Partial'
+            ELSE 'Unpaid'
+        END
+    FROM leases l
+    JOIN users u ON u.id = l.tenant_id
+    LEFT JOIN rent_payments rp
+        ON rp.lease_id = l.id
+        AND rp.month = p_month
+        AND rp.year = p_year
+        AND rp.status = 'Paid'
+    WHERE l.landlord_id = p_landlord_id
+      AND l.is_active
+    GROUP BY l.id, u.id
+    ORDER BY l.id;
+$$;
+
+-- ============================================
+-- APP DATA VERSION
+-- ============================================
+-- Opaque string that changes whenever a user, lease, rent payment,
+-- maintenance request or announcement is inserted, updated or deleted. Used
+-- to build ETags for the landlord pages and the calendar feed. Reads the
+-- trigger-maintained counter row from supabase_schema.sql.
+CREATE OR REPLACE FUNCTION app_data_version()
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT version::TEXT FROM app_data_state WHERE id;
+$$;
+
+-- ============================================
+-- ACTIVE FLAG TOGGLES
+-- ============================================
+-- Flip is_active on a landlord's lease / announcement in one atomic UPDATE
+-- and return the new value. No row is returned when the id does not exist
+-- or belongs to another landlord. (toggle_announcement_active needs the
+-- table from supabase_announcements.sql.)
+CREATE OR REPLACE FUNCTION toggle_lease_active(
+    p_lease_id INTEGER,
+    p_landlord_id INTEGER
+)
+RETURNS TABLE (
+    new_is_active BOOLEAN
+)
+LANGUAGE sql
+AS $$
+    UPDATE leases
+    SET is_active = NOT leases.is_active
+    WHERE leases.id = p_lease_id
+      AND leases.landlord_id = p_landlord_id
+    RETURNING leases.is_active;
+$$;
+
+CREATE OR REPLACE FUNCTION toggle_announcement_active(
+    p_announcement_id INTEGER,
+    p_landlord_id INTEGER
+)
+RETURNS TABLE (
+    new_is_active BOOLEAN
+)
+LANGUAGE sql
+AS $$
+    UPDATE announcements
+    SET is_active = NOT announcements.is_active
+    WHERE announcements.id = p_announcement_id
+      AND announcements.landlord_id = p_landlord_id
+    RETURNING announcements.is_active;
+$$;
+
+-- ============================================
+-- DELETE MAINTENANCE REQUEST
+-- ============================================
+-- Deletes a maintenance request only if it was filed by one of the
+-- landlord's tenants, checked and deleted in one statement. Returns the
+-- deleted id, or no row when nothing matched.
+CREATE OR REPLACE FUNCTION delete_maintenance_request(
+    p_request_id INTEGER,
+    p_landlord_id INTEGER
+)
+RETURNS TABLE (
+    deleted_id INTEGER
+)
+LANGUAGE sql
+AS $$
+    DELETE FROM maintenance_requests mr
+    WHERE mr.id = p_request_id
+      AND mr.tenant_id IN (
+          SELECT l.tenant_id FROM leases l WHERE l.landlord_id = p_landlord_id
+      )
+    RETURNING mr.id;
+$$;
+
+-- ============================================
+-- LANDLORD CALENDAR PAYLOAD
+-- ============================================
+-- Everything the landlord calendar needs as one JSON document: active
+-- leases with the tenant's display name, the maintenance requests of those
+-- tenants and the landlord's announcements. (Needs the table from
+-- supabase_announcements.sql.)
+CREATE OR REPLACE FUNCTION calendar_payload_for_landlord(
+    p_landlord_id INTEGER
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'leases', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'tenant_id', l.tenant_id,
+                'tenant_display', COALESCE(NULLIF(u.full_name, ''), u.username),
+                'monthly_rent', l.monthly_rent,
+                'due_day', l.due_day,
+                'end_date', l.end_date
+            ))
+            FROM leases l
+            JOIN users u ON u.id = l.tenant_id
+            WHERE l.landlord_id = p_landlord_id
+              AND l.is_active
+        ), '[]'::jsonb),
+        'requests', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'tenant_id', mr.tenant_id,
+                'title', mr.title,
+                'created_at', mr.created_at,
+                'status', mr.status
+            ))
+            FROM maintenance_requests mr
+            WHERE mr.tenant_id IN (
+                SELECT l.tenant_id FROM leases l
+                WHERE l.landlord_id = p_landlord_id
+                  AND l.is_active
+            )
+        ), '[]'::jsonb),
+        'announcements', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'title', a.title,
+                'created_at', a.created_at
+            ))
+            FROM announcements a
+            WHERE a.landlord_id = p_landlord_id
+        ), '[]'::jsonb)
+    );
+$$;
+
+-- ============================================
+-- DONE! Functions are ready.
+-- ============================================
@@ -44,6 +44,11 @@ CREATE TABLE IF NOT EXISTS leases (
 CREATE INDEX IF NOT EXISTS idx_leases_tenant_id ON leases(tenant_id);
 CREATE INDEX IF NOT EXISTS idx_leases_landlord_id ON leases(landlord_id);
 CREATE INDEX IF NOT EXISTS idx_leases_active ON leases(is_active);
+-- Serves get_active_lease_for_tenant's filter and "ORDER BY id DESC LIMIT 1"
+CREATE INDEX IF NOT EXISTS idx_leases_tenant_active_id ON leases(tenant_id, is_active, id DESC);
+-- Partial index over active leases only: smaller, and covers the landlord
+-- "active tenant ids" lookups as an index-only scan
+CREATE INDEX IF NOT EXISTS idx_leases_active_landlord_tenant ON leases(landlord_id, tenant_id) WHERE is_active;
 
 -- ============================================
 -- RENT PAYMENTS TABLE
@@ -57,12 +62,21 @@ CREATE TABLE IF NOT EXISTS rent_payments (
     status TEXT NOT NULL DEFAULT 'Paid',
     paid_at TIMESTAMPTZ DEFAULT NOW(),
     method TEXT,
-    note TEXT
+    note TEXT,
+    stripe_session_id TEXT
 );
 
+-- For databases created before stripe_session_id existed
+ALTER TABLE rent_payments ADD COLUMN IF NOT EXISTS stripe_session_id TEXT;
+
 -- Indexes for rent queries
 CREATE INDEX IF NOT EXISTS idx_rent_payments_lease_id ON rent_payments(lease_id);
 CREATE INDEX IF NOT EXISTS idx_rent_payments_month_year ON rent_payments(month, year);
+-- INCLUDE lets the monthly Paid totals be summed with an index-only scan
+CREATE INDEX IF NOT EXISTS idx_rent_payments_lease_year_month ON rent_payments(lease_id, year, month) INCLUDE (amount, status);
+CREATE INDEX IF NOT EXISTS idx_rent_payments_paid_at ON rent_payments(paid_at DESC);
+-- One payment per Stripe Checkout session, so webhook retries are no-ops
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rent_payments_stripe_session_id ON rent_payments(stripe_session_id);
 
 -- ============================================
 -- MAINTENANCE REQUESTS TABLE
@@ -82,6 +96,46 @@ CREATE TABLE IF NOT EXISTS maintenance_requests (
 CREATE INDEX IF NOT EXISTS idx_maintenance_requests_tenant_id ON maintenance_requests(tenant_id);
 CREATE INDEX IF NOT EXISTS idx_maintenance_requests_status ON maintenance_requests(status);
 CREATE INDEX IF NOT EXISTS idx_maintenance_requests_created_at ON maintenance_requests(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_maintenance_requests_tenant_created ON maintenance_requests(tenant_id, created_at DESC);
+
+-- ============================================
+-- CHANGE TRACKING
+-- ============================================
+-- A single counter row, bumped once per INSERT/UPDATE/DELETE statement on
+-- the tables behind the landlord pages, so app_data_version()
+-- (supabase_functions.sql) can tell when cached pages are stale with one
+-- primary-key read.
+CREATE TABLE IF NOT EXISTS app_data_state (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO app_data_state (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_app_data_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE app_data_state SET version = version + 1;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_users_data_version ON users;
+CREATE TRIGGER trg_users_data_version AFTER INSERT OR UPDATE OR DELETE ON users
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_app_data_version();
+
+DROP TRIGGER IF EXISTS trg_leases_data_version ON leases;
+CREATE TRIGGER trg_leases_data_version AFTER INSERT OR UPDATE OR DELETE ON leases
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_app_data_version();
+
+DROP TRIGGER IF EXISTS trg_rent_payments_data_version ON rent_payments;
+CREATE TRIGGER trg_rent_payments_data_version AFTER INSERT OR UPDATE OR DELETE ON rent_payments
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_app_data_version();
+
+DROP TRIGGER IF EXISTS trg_maintenance_requests_data_version ON maintenance_requests;
+CREATE TRIGGER trg_maintenance_requests_data_version AFTER INSERT OR UPDATE OR DELETE ON maintenance_requests
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_app_data_version();
 
 -- ============================================
 -- ROW LEVEL SECURITY (RLS) - Optional but recommended
@@ -91,6 +145,7 @@ ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE leases ENABLE ROW LEVEL SECURITY;
 ALTER TABLE rent_payments ENABLE ROW LEVEL SECURITY;
 ALTER TABLE maintenance_requests ENABLE ROW LEVEL SECURITY;
+ALTER TABLE app_data_state ENABLE ROW LEVEL SECURITY;
 
 -- For now, allow all operations when using service role key
 -- (These policies allow the service role to do everything)
@@ -106,6 +161,19 @@ CREATE POLICY "Service role full access on rent_payments" ON rent_payments
 CREATE POLICY "Service role full access on maintenance_requests" ON maintenance_requests
     FOR ALL USING (true) WITH CHECK (true);
 
+CREATE POLICY "Service role full access on app_data_state" ON app_data_state
+    FOR ALL USING (true) WITH CHECK (true);
+
+-- On a large live database, the CREATE INDEX statements above can be run
+-- one at a time as CREATE INDEX CONCURRENTLY (outside a transaction) to
+-- avoid blocking writes.
+
+-- Refresh planner statistics so the new indexes are used right away
+ANALYZE users;
+ANALYZE leases;
+ANALYZE rent_payments;
+ANALYZE maintenance_requests;
+
 -- ============================================
 -- DONE! Your tables are ready.
 -- ============================================
@@ -0,0 +1,31 @@
+-- ============================================
+-- Supabase Schema for DeepL Translation Cache
+-- ============================================
+-- Run this SQL in your Supabase SQL Editor AFTER running supabase_schema.sql
+-- ============================================
+
+-- Cached DeepL translations, shared by all app workers.
+-- hash is the hex BLAKE2b-128 digest of the source text.
+CREATE TABLE IF NOT EXISTS translation_cache (
+    hash TEXT NOT NULL,
+    target_lang TEXT NOT NULL,
+    translated TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (hash, target_lang)
+);
+
+-- Index for expiring old entries
+CREATE INDEX IF NOT EXISTS idx_translation_cache_created_at ON translation_cache(created_at);
+
+-- Row Level Security (service role has full access)
+ALTER TABLE translation_cache ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role full access on translation_cache" ON translation_cache
+    FOR ALL USING (true) WITH CHECK (true);
+
+-- Optional cleanup, e.g. scheduled with pg_cron:
+-- DELETE FROM translation_cache WHERE created_at < NOW() - INTERVAL '30 days';
+
+-- ============================================
+-- DONE! Translation cache table is ready.
+-- ============================================